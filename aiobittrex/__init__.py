@@ -1,11 +1,19 @@
+from .account import AccountState
 from .api import BittrexAPI
+from .book import OrderBook, OrderBookManager
+from .cache import TTLCache
+from .depth import DepthBook
+from .orders import OrderTracker
+from .candles import CandleBuilder, Candles
 from .errors import (
     BittrexError,
     BittrexRestError,
     BittrexSocketError,
     BittrexApiError,
     BittrexResponseError,
+    BittrexThrottledError,
     BittrexSocketConnectionClosed,
     BittrexSocketConnectionError
 )
 from .socket import BittrexSocket
+from .summary import SummaryCache
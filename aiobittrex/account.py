@@ -0,0 +1,193 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+BALANCE_KEYS = {
+    'Currency': 'currency',
+    'Balance': 'balance',
+    'Available': 'available',
+    'Pending': 'pending',
+    'CryptoAddress': 'crypto_address'
+}
+
+ORDER_KEYS = {
+    'OrderUuid': 'order_uuid',
+    'Exchange': 'exchange',
+    'OrderType': 'order_type',
+    'Type': 'order_type',
+    'Quantity': 'quantity',
+    'QuantityRemaining': 'quantity_remaining',
+    'Limit': 'limit',
+    'CommissionPaid': 'commission_paid',
+    'Price': 'price',
+    'PricePerUnit': 'price_per_unit',
+    'Opened': 'opened',
+    'Closed': 'closed',
+    'IsOpen': 'is_open',
+    'CancelInitiated': 'cancel_initiated',
+    'ImmediateOrCancel': 'immediate_or_cancel',
+    'IsConditional': 'is_conditional',
+    'Condition': 'condition',
+    'ConditionTarget': 'condition_target'
+}
+
+
+def _rest_to_socket(item: Dict, keys: Dict) -> Dict:
+    return {keys.get(k, k): v for k, v in item.items()}
+
+
+class AccountState:
+    """Balances and open orders kept up to date from listen_account.
+
+    Seeded from get_balances/get_open_orders and updated with uB/uO deltas (a delta carries the full state
+    of a balance or an order), deltas not newer than the last applied nonce are skipped.
+    Reconciliation replaces the state with REST results except balances and orders changed
+    by deltas while the REST requests were in flight. Balances and orders are in the socket format,
+    REST results are converted (order opened/closed are ISO strings for orders loaded from REST).
+    """
+    OPEN = 0
+    PARTIAL = 1
+    FILL = 2
+    CANCEL = 3
+
+    def __init__(self):
+        self.version = 0
+        self.seeded = False
+        self.drift = 0
+        self.balances = {}
+        self.orders = {}
+        self._versions = {}
+        self._nonces = {}
+        self._seeded = None
+
+    def available(self, currency: str) -> float:
+        balance = self.balances.get(currency)
+        return (balance['available'] or 0.0) if balance else 0.0
+
+    def balance(self, currency: str) -> Optional[Dict]:
+        return self.balances.get(currency)
+
+    def open_orders(self, market: Optional[str] = None) -> List[Dict]:
+        return [o for o in self.orders.values() if market is None or o['exchange'] == market]
+
+    def order(self, order_uuid: str) -> Optional[Dict]:
+        return self.orders.get(order_uuid)
+
+    def _check_nonce(self, stream: str, nonce) -> bool:
+        if nonce is None:
+            return True
+        if nonce <= self._nonces.get(stream, -1):
+            return False
+        self._nonces[stream] = nonce
+        return True
+
+    def apply(self, message: Dict) -> bool:
+        """Apply a listen_account message, returns False if it was skipped."""
+        if 'delta' in message:
+            if not self._check_nonce('balance', message.get('nonce')):
+                return False
+            delta = message['delta']
+            self.balances[delta['currency']] = delta
+            self._touch(('balance', delta['currency']))
+        else:
+            if not self._check_nonce('order', message.get('nonce')):
+                return False
+            order = message['order']
+            if message.get('type') in (self.FILL, self.CANCEL) or order.get('is_open') is False:
+                self.orders.pop(order['order_uuid'], None)
+            else:
+                self.orders[order['order_uuid']] = order
+            self._touch(('order', order['order_uuid']))
+        return True
+
+    def _touch(self, key):
+        self.version += 1
+        self._versions[key] = self.version
+
+    def load(self, balances: List[Dict], open_orders: List[Dict], version: int = 0):
+        """Load REST results, balances and orders changed by deltas after the version are kept."""
+        drift = 0
+
+        for item in balances or ():
+            balance = _rest_to_socket(item, BALANCE_KEYS)
+            currency = balance['currency']
+            if self._versions.get(('balance', currency), 0) > version:
+                continue
+            current = self.balances.get(currency)
+            if current is None or current.get('balance') != balance['balance'] \
+                    or current.get('available') != balance['available']:
+                drift += current is not None
+                self.balances[currency] = dict(current or {}, **balance)
+
+        rest_orders = {}
+        for item in open_orders or ():
+            order = _rest_to_socket(item, ORDER_KEYS)
+            rest_orders[order['order_uuid']] = order
+        for order_uuid in list(self.orders):
+            if order_uuid not in rest_orders and self._versions.get(('order', order_uuid), 0) <= version:
+                del self.orders[order_uuid]
+                drift += 1
+        for order_uuid, order in rest_orders.items():
+            if self._versions.get(('order', order_uuid), 0) > version:
+                continue
+            current = self.orders.get(order_uuid)
+            if current is None:
+                drift += self.seeded
+                self.orders[order_uuid] = order
+            elif current.get('quantity_remaining') != order['quantity_remaining']:
+                drift += 1
+                current.update(order)
+
+        if self.seeded and drift:
+            logger.warning('Account state drift: %s balances/orders corrected.', drift)
+        self.drift += drift if self.seeded else 0
+        self.seeded = True
+        if self._seeded is not None and not self._seeded.done():
+            self._seeded.set_result(None)
+
+    async def reconcile(self, api):
+        """Reload balances and open orders from REST."""
+        version = self.version
+        balances, open_orders = await asyncio.gather(api.get_balances(), api.get_open_orders())
+        self.load(balances, open_orders, version=version)
+
+    async def wait_seeded(self, timeout: float = None):
+        if self.seeded:
+            return
+        if self._seeded is None or self._seeded.done():
+            self._seeded = asyncio.get_event_loop().create_future()
+        await asyncio.wait_for(asyncio.shield(self._seeded), timeout)
+
+    async def run(self, socket, api, interval: float = 300.0, **queue_options):
+        """Seed the state and keep it up to date, reconciles every interval seconds and after a reconnect.
+
+        Runs until the socket subscription is closed.
+        """
+        messages = socket.listen_account(**queue_options)
+        reconciler = asyncio.ensure_future(self._reconcile_periodically(api, interval))
+        reconnects = socket.connection.reconnects
+        try:
+            async for message in messages:
+                if socket.connection.reconnects != reconnects:
+                    # deltas could be missed and nonces restarted
+                    reconnects = socket.connection.reconnects
+                    self._nonces.clear()
+                    reconciler.cancel()
+                    reconciler = asyncio.ensure_future(self._reconcile_periodically(api, interval))
+                self.apply(message)
+        finally:
+            reconciler.cancel()
+
+    async def _reconcile_periodically(self, api, interval: float):
+        while True:
+            try:
+                await self.reconcile(api)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error('Account state reconciliation failed: %s', e)
+            await asyncio.sleep(interval)
@@ -1,8 +1,9 @@
 import asyncio
-import hashlib
-import hmac
+import logging
+import random
 from asyncio import AbstractEventLoop
-from time import time
+from email.utils import parsedate_to_datetime
+from time import perf_counter, time
 from typing import Optional, Dict
 from urllib.parse import urlencode
 
@@ -10,7 +11,15 @@ import aiohttp
 from aiohttp import ClientTimeout
 from asyncio_throttle import Throttler
 
-from .errors import BittrexResponseError, BittrexApiError, BittrexRestError
+from .cache import TTLCache
+from .candles import Candles
+from .errors import BittrexResponseError, BittrexApiError, BittrexRestError, BittrexThrottledError
+from .metrics import Metrics
+from .scheduler import RequestScheduler, ThrottlerScheduler
+from .signing import Signer
+
+
+logger = logging.getLogger(__name__)
 
 
 class BittrexAPI:
@@ -19,25 +28,54 @@ class BittrexAPI:
     https://github.com/ericsomdahl/python-bittrex/blob/master/bittrex/bittrex.py
     """
     API_URL = 'https://bittrex.com/api'
+    CANDLES_TTL = {
+        'oneMin': 10,
+        'fiveMin': 30,
+        'thirtyMin': 60,
+        'hour': 60,
+        'day': 300
+    }
+    THROTTLE_STATUSES = {429, 503, 520, 521, 522, 523, 524}
 
     def __init__(
             self,
             api_key: Optional[str] = None,
             api_secret: Optional[str] = None,
             throttler: Throttler = None,
+            scheduler: RequestScheduler = None,
             loop: AbstractEventLoop = None,
             session: aiohttp.ClientSession = None,
-            timeout: int = 20
+            timeout: int = 20,
+            cache: TTLCache = None,
+            retries: int = 2,
+            retry_backoff: float = 0.5,
+            bulk_threshold: int = 1,
+            api_url: Optional[str] = None,
+            metrics: Metrics = None
     ):
         self.api_key = api_key or ''
         self.api_secret = api_secret or ''
+        self._signer = Signer(self.api_secret)
         self._loop = loop or asyncio.get_event_loop()
-        self._throttler = throttler or self._init_throttler()
+        self._scheduler = scheduler or (ThrottlerScheduler(throttler) if throttler else self._init_scheduler())
         self._session = session or self._init_session(timeout)
+        self._cache = cache if cache is not None else self._init_cache()
+        self._revalidating = set()
+        self._in_flight = {}
+        self.coalesced = 0
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.bulk_threshold = bulk_threshold
+        self.api_url = (api_url or self.API_URL).rstrip('/')
+        self.metrics = metrics or Metrics()
+
+    @staticmethod
+    def _init_scheduler() -> RequestScheduler:
+        return RequestScheduler(rate_limit=60, period=60.0)  # https://bittrex.github.io/api/v1-1#call-limits
 
     @staticmethod
-    def _init_throttler() -> Throttler:
-        return Throttler(rate_limit=60, period=60.0)  # https://bittrex.github.io/api/v1-1#call-limits
+    def _init_cache() -> TTLCache:
+        return TTLCache(maxsize=512)
 
     def _init_session(self, timeout: int) -> aiohttp.ClientSession:
         return aiohttp.ClientSession(
@@ -54,40 +92,124 @@ class BittrexAPI:
         await asyncio.sleep(delay)
         await self._session.close()
 
-    async def _request(self, path, options=None, authenticate=False, version='v1.1'):
+    async def _request(self, path, options=None, authenticate=False, version='v1.1', ttl=None, priority=None):
+        """
+        :param ttl: cache the result for ttl seconds, authenticated requests are never cached
+        :param priority: RequestScheduler priority class, ACCOUNT for authenticated requests by default
+        """
         options = options or {}
 
         if authenticate:
-            options.update({
-                'apikey': self.api_key,
-                'nonce': self._nonce()
-            })
+            # the nonce is added and the url is signed after a rate limiter slot is acquired
+            options['apikey'] = self.api_key
+            url = self._compose_url(version, path, options)
+            priority = RequestScheduler.ACCOUNT if priority is None else priority
+            return await self._fetch(url, {}, priority, version, sign=True)
 
         url = self._compose_url(version, path, options)
-        headers = {'apisign': self._get_signature(url)} if authenticate else {}
+        if not ttl:
+            return await self._fetch_once(url, version)
+
+        state, result = self._cache.lookup(url)
+        if state == TTLCache.STALE and url not in self._revalidating:
+            self._revalidating.add(url)
+            asyncio.ensure_future(self._revalidate(url, version, ttl))
+        if state != TTLCache.MISS:
+            return result
+
+        result = await self._fetch_once(url, version)
+        self._cache.set(url, result, ttl)
+        return result
 
-        async with self._throttler:
-            async with self._session.get(url=url, headers=headers) as response:
-                return await self._handle_response(response)
+    async def _fetch_once(self, url, version):
+        """Concurrent unauthenticated requests for the same url share a single request."""
+        future = self._in_flight.get(url)
+        if future is None:
+            future = self._in_flight[url] = asyncio.ensure_future(self._fetch_with_retries(url, version))
+            future.add_done_callback(lambda f: self._in_flight.pop(url, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(future)
+
+    async def _fetch_with_retries(self, url, version):
+        """Public requests are idempotent, retry them on throttling, server and connection errors."""
+        attempt = 0
+        while True:
+            try:
+                return await self._fetch(url, {}, RequestScheduler.PUBLIC, version)
+            except (BittrexResponseError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt >= self.retries or not self._is_retryable(e):
+                    raise
+                delay = random.uniform(0, self.retry_backoff * 2 ** attempt)
+                attempt += 1
+                logger.warning('Request %s failed: %r, retry %s in %.3fs.', url, e, attempt, delay)
+                await asyncio.sleep(delay)
 
     @staticmethod
-    def _nonce() -> str:
-        return f'{int(time() * 1000)}'
+    def _is_retryable(e: Exception) -> bool:
+        if isinstance(e, BittrexResponseError):
+            return isinstance(e, BittrexThrottledError) or e.status >= 500
+        return True
+
+    async def _fetch(self, url, headers, priority, version, sign=False):
+        """
+        :param sign: add a nonce and the signature header once a slot is acquired,
+            so nonces reach the server in the order the requests are sent
+        """
+        metrics = self.metrics
+        tags = {'endpoint': url.partition('?')[0][len(self.api_url) + 1:]}
+        started = perf_counter()
+        await self._scheduler.acquire(priority=priority, version=version)
+        acquired = perf_counter()
+        if sign:
+            url = f'{url}&nonce={self._nonce()}'
+            headers = dict(headers, apisign=self._get_signature(url))
+        metrics.observe(
+            'request_wait_seconds',
+            acquired - started,
+            dict(tags, priority=RequestScheduler.NAMES.get(priority, str(priority)))
+        )
+        try:
+            async with self._session.get(url=url, headers=headers) as response:
+                metrics.observe('response_bytes', len(await response.read()), tags)
+                result = await self._handle_response(response)
+        except Exception as e:
+            metrics.increment('request_errors_total', tags=dict(tags, error=type(e).__name__))
+            if isinstance(e, BittrexThrottledError):
+                self._on_throttled(e)
+            raise
+        finally:
+            metrics.observe('request_seconds', perf_counter() - acquired, tags)
+        self._scheduler.succeeded()
+        return result
+
+    def _on_throttled(self, e: BittrexThrottledError):
+        logger.warning('Throttled: %s, retry after: %s.', e.status, e.retry_after)
+        self._scheduler.throttled(retry_after=e.retry_after)
+
+    async def _revalidate(self, url, version, ttl):
+        try:
+            self._cache.set(url, await self._fetch_once(url, version), ttl)
+        except (BittrexRestError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning('Cache revalidation failed for %s: %s', url, e)
+        finally:
+            self._revalidating.discard(url)
+
+    def _nonce(self) -> str:
+        return f'{self._signer.nonce()}'
 
     def _compose_url(self, version: str, path: str, options: Dict) -> str:
-        result = f'{self.API_URL}/{version}/{path}'
+        result = f'{self.api_url}/{version}/{path}'
         if options:
             result = f'{result}?{urlencode(options)}'
         return result
 
     def _get_signature(self, url: str) -> str:
-        return hmac.new(
-            key=self.api_secret.encode(),
-            msg=url.encode(),
-            digestmod=hashlib.sha512
-        ).hexdigest()
+        return self._signer.sign(url)
 
     async def _handle_response(self, response: aiohttp.ClientResponse) -> Dict:
+        if response.status in self.THROTTLE_STATUSES or self._is_cloudflare_page(response):
+            raise BittrexThrottledError(response.status, await response.text(), self._retry_after(response))
         try:
             response_json = await response.json()
         except aiohttp.ContentTypeError:
@@ -98,6 +220,28 @@ class BittrexAPI:
             self._raise_if_error(response_json)
             return response_json['result']
 
+    @staticmethod
+    def _is_cloudflare_page(response: aiohttp.ClientResponse) -> bool:
+        return (
+            response.status >= 400
+            and response.content_type == 'text/html'
+            and 'cloudflare' in response.headers.get('Server', '').lower()
+        )
+
+    @staticmethod
+    def _retry_after(response: aiohttp.ClientResponse) -> Optional[float]:
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time())
+        except (TypeError, ValueError):
+            return None
+
     @staticmethod
     def _raise_if_error(response_json: Dict) -> None:
         if not response_json['success']:
@@ -119,7 +263,7 @@ class BittrexAPI:
             "LogoUrl": "https://bittrexblobstorage.blob.core.windows.net/public/6defbc41-582d-47a6-bb2e-d0fa88663524.png"
         }]
         """
-        return self._request(path='public/getmarkets')
+        return self._request(path='public/getmarkets', ttl=60)
 
     def get_currencies(self):
         """Get all supported currencies at Bittrex along with other meta data
@@ -134,7 +278,7 @@ class BittrexAPI:
             "Notice": null
         }]
         """
-        return self._request(path='public/getcurrencies')
+        return self._request(path='public/getcurrencies', ttl=300)
 
     def get_ticker(self, market):
         """Get the current tick values for a market
@@ -188,6 +332,45 @@ class BittrexAPI:
         if result:
             return result[0]
 
+    async def get_market_summaries_for(self, markets):
+        """Get the last 24 hour summaries for the markets
+
+        A single bulk request (get_market_summaries) is used for more than bulk_threshold markets,
+        a request per market otherwise. Unknown markets are missing in the result.
+        {
+            "BTC-LTC": {
+                "MarketName": "BTC-LTC",
+                "High": 0.01717,
+                ...
+            }
+        }
+        """
+        markets = list(dict.fromkeys(markets))
+        if len(markets) <= self.bulk_threshold:
+            summaries = await asyncio.gather(*(self.get_market_summary(m) for m in markets))
+            return {m: s for m, s in zip(markets, summaries) if s}
+
+        index = {s['MarketName']: s for s in await self.get_market_summaries() or ()}
+        return {m: index[m] for m in markets if m in index}
+
+    async def get_tickers(self, markets):
+        """Get the current tick values for the markets, see get_market_summaries_for
+        {
+            "BTC-LTC": {
+                "Bid": 0.01702595,
+                "Ask": 0.01709242,
+                "Last": 0.01702595
+            }
+        }
+        """
+        markets = list(dict.fromkeys(markets))
+        if len(markets) <= self.bulk_threshold:
+            tickers = await asyncio.gather(*(self.get_ticker(m) for m in markets))
+            return {m: t for m, t in zip(markets, tickers) if t}
+
+        summaries = await self.get_market_summaries_for(markets)
+        return {m: {'Bid': s['Bid'], 'Ask': s['Ask'], 'Last': s['Last']} for m, s in summaries.items()}
+
     def get_order_book(self, market, order_type='both'):
         """Retrieve the orderbook for a given market
         :param order_type: 'buy', 'sell', 'both'
@@ -239,6 +422,7 @@ class BittrexAPI:
             path='market/buylimit',
             options={'market': market, 'quantity': quantity, 'rate': rate},
             authenticate=True,
+            priority=RequestScheduler.TRADE
         )
 
     def sell_limit(self, market, quantity, rate):
@@ -251,6 +435,7 @@ class BittrexAPI:
             path='market/selllimit',
             options={'market': market, 'quantity': quantity, 'rate': rate},
             authenticate=True,
+            priority=RequestScheduler.TRADE
         )
 
     def cancel_order(self, order_id):
@@ -259,7 +444,8 @@ class BittrexAPI:
         return self._request(
             path='market/cancel',
             options={'uuid': order_id},
-            authenticate=True
+            authenticate=True,
+            priority=RequestScheduler.TRADE
         )
 
     def get_open_orders(self, market=None):
@@ -481,7 +667,8 @@ class BittrexAPI:
         """
         return self._request(
             path='pub/Currencies/GetWalletHealth',
-            version='v2.0'
+            version='v2.0',
+            ttl=60
         )
 
     def get_pending_withdrawals(self, currency=None):
@@ -504,9 +691,10 @@ class BittrexAPI:
             version='v2.0'
         )
 
-    def get_candles(self, market, tick_interval):
+    async def get_candles(self, market, tick_interval, columnar=False, maxlen=None):
         """Get tick candles for market
         Intervals: oneMin, fiveMin, hour, day
+        With columnar=True returns Candles (NumPy structured array), keeps the latest maxlen candles if set.
         [{
             "O": 0.017059,
             "H": 0.01712003,
@@ -517,11 +705,15 @@ class BittrexAPI:
             "BV": 0.83816494
         }]
         """
-        return self._request(
+        result = await self._request(
             path='pub/market/GetTicks',
             options={'marketName': market, 'tickInterval': tick_interval},
-            version='v2.0'
+            version='v2.0',
+            ttl=self.CANDLES_TTL.get(tick_interval)
         )
+        if columnar:
+            return Candles.from_records(result or [], maxlen=maxlen)
+        return result
 
     async def get_latest_candle(self, market, tick_interval):
         """Get the latest candle for the marke
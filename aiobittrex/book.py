@@ -0,0 +1,206 @@
+from bisect import bisect_left
+from typing import Dict, List, Optional
+
+
+class BookSide:
+    """One side of an order book.
+
+    Levels are kept in a dict (rate -> quantity) and a sorted list of rates,
+    so a level lookup is O(1), an insert/remove is a binary search plus a memmove
+    and the best level is always at one end of the list.
+    """
+
+    def __init__(self, reverse: bool = False):
+        self.reverse = reverse
+        self._levels = {}
+        self._rates = []
+
+    def __len__(self) -> int:
+        return len(self._rates)
+
+    def __contains__(self, rate) -> bool:
+        return rate in self._levels
+
+    def clear(self):
+        self._levels.clear()
+        self._rates.clear()
+
+    def set(self, rate: float, quantity: float):
+        if rate not in self._levels:
+            rates = self._rates
+            rates.insert(bisect_left(rates, rate), rate)
+        self._levels[rate] = quantity
+
+    def remove(self, rate: float):
+        if self._levels.pop(rate, None) is not None:
+            rates = self._rates
+            del rates[bisect_left(rates, rate)]
+
+    def get(self, rate: float) -> Optional[float]:
+        return self._levels.get(rate)
+
+    def best(self) -> Optional[Dict]:
+        if not self._rates:
+            return None
+        rate = self._rates[-1] if self.reverse else self._rates[0]
+        return {'rate': rate, 'quantity': self._levels[rate]}
+
+    def levels(self, depth: Optional[int] = None) -> List[Dict]:
+        """Levels from the best to the worst rate."""
+        rates = self._rates
+        if self.reverse:
+            rates = rates[::-1] if depth is None else rates[:-depth - 1:-1]
+        elif depth is not None:
+            rates = rates[:depth]
+        levels = self._levels
+        return [{'rate': r, 'quantity': levels[r]} for r in rates]
+
+
+class OrderBook:
+    """Local order book for a single market.
+
+    Built from a QueryExchangeState snapshot and kept up to date with
+    SubscribeToExchangeDeltas (uE) updates.
+    """
+    ADD = 0
+    REMOVE = 1
+    UPDATE = 2
+
+    def __init__(self, market: str, nonce: int = 0):
+        self.market = market
+        self.nonce = nonce
+        self.buys = BookSide(reverse=True)
+        self.sells = BookSide()
+
+    @classmethod
+    def from_snapshot(cls, market: str, state: Dict) -> 'OrderBook':
+        book = cls(market=market)
+        book.load(state)
+        return book
+
+    def load(self, state: Dict):
+        """Replace the book content with a (translated) exchange state snapshot."""
+        self.nonce = state['nonce']
+        for side, levels in ((self.buys, state.get('buys')), (self.sells, state.get('sells'))):
+            side.clear()
+            for level in levels or ():
+                side.set(level['rate'], level['quantity'])
+
+    def apply(self, delta: Dict) -> bool:
+        """Apply a (translated) exchange delta, returns False if the delta is not newer than the book."""
+        if delta['nonce'] <= self.nonce:
+            return False
+        self._apply_side(self.buys, delta.get('buys'))
+        self._apply_side(self.sells, delta.get('sells'))
+        self.nonce = delta['nonce']
+        return True
+
+    def _apply_side(self, side: BookSide, changes):
+        for change in changes or ():
+            if change['type'] == self.REMOVE or not change['quantity']:
+                side.remove(change['rate'])
+            else:
+                side.set(change['rate'], change['quantity'])
+
+    def best_bid(self) -> Optional[Dict]:
+        return self.buys.best()
+
+    def best_ask(self) -> Optional[Dict]:
+        return self.sells.best()
+
+    def spread(self) -> Optional[float]:
+        bid, ask = self.buys.best(), self.sells.best()
+        if bid is None or ask is None:
+            return None
+        return ask['rate'] - bid['rate']
+
+    def to_dict(self, depth: Optional[int] = None) -> Dict:
+        return {
+            'market_name': self.market,
+            'nonce': self.nonce,
+            'buys': self.buys.levels(depth),
+            'sells': self.sells.levels(depth)
+        }
+
+
+class OrderBookManager:
+    """Order books for many markets.
+
+    Deltas for a market are buffered while its snapshot is in flight, a nonce gap
+    puts the market back into the buffering state and adds it to `resync`,
+    the caller is expected to request a new snapshot for markets in `resync`.
+    """
+
+    def __init__(self):
+        self._books = {}
+        self._pending = {}
+        self.resync = set()
+
+    def __contains__(self, market) -> bool:
+        return market in self._books
+
+    def __getitem__(self, market) -> OrderBook:
+        return self._books[market]
+
+    def __iter__(self):
+        return iter(self._books)
+
+    def __len__(self) -> int:
+        return len(self._books)
+
+    def get(self, market) -> Optional[OrderBook]:
+        return self._books.get(market)
+
+    def is_pending(self, market) -> bool:
+        return market in self._pending
+
+    def expect(self, market: str):
+        """Start buffering deltas for the market, call before requesting a snapshot."""
+        self._pending.setdefault(market, [])
+
+    def snapshot(self, market: str, state: Dict) -> OrderBook:
+        """Load an exchange state snapshot and replay buffered deltas.
+
+        QueryExchangeState responses have market_name set to null, so the market is passed explicitly.
+        """
+        book = self._books.get(market)
+        if book is None:
+            book = self._books[market] = OrderBook(market=market)
+        book.load(state)
+        self.resync.discard(market)
+
+        buffered = sorted(self._pending.pop(market, None) or (), key=lambda d: d['nonce'])
+        for n, delta in enumerate(buffered):
+            if delta['nonce'] <= book.nonce:
+                continue
+            if delta['nonce'] != book.nonce + 1:
+                self._gap(market, *buffered[n:])
+                break
+            book.apply(delta)
+        return book
+
+    def apply(self, delta: Dict) -> Optional[OrderBook]:
+        """Apply an exchange delta, returns the updated book or None if the delta was skipped or buffered."""
+        market = delta['market_name']
+        buffered = self._pending.get(market)
+        if buffered is not None:
+            buffered.append(delta)
+            return None
+
+        book = self._books.get(market)
+        if book is None or delta['nonce'] <= book.nonce:
+            return None
+        if delta['nonce'] != book.nonce + 1:
+            self._gap(market, delta)
+            return None
+        book.apply(delta)
+        return book
+
+    def _gap(self, market: str, *deltas: Dict):
+        self._pending[market] = list(deltas)
+        self.resync.add(market)
+
+    def remove(self, market: str):
+        self._books.pop(market, None)
+        self._pending.pop(market, None)
+        self.resync.discard(market)
@@ -0,0 +1,61 @@
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Hashable, Tuple
+
+
+class TTLCache:
+    """LRU cache with per item TTL.
+
+    An expired item is still returned as stale during stale_ttl seconds,
+    the caller is expected to refresh it in background (stale-while-revalidate).
+    """
+    MISS = 'miss'
+    FRESH = 'fresh'
+    STALE = 'stale'
+
+    def __init__(self, maxsize: int = 512, stale_ttl: float = 0.0, clock=monotonic):
+        self.maxsize = maxsize
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._data = OrderedDict()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key) -> bool:
+        return key in self._data
+
+    def lookup(self, key: Hashable) -> Tuple[str, Any]:
+        """Returns (state, value), state is one of MISS, FRESH, STALE."""
+        item = self._data.get(key)
+        if item is not None:
+            value, expires_at = item
+            now = self._clock()
+            if now < expires_at:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self.FRESH, value
+            if now < expires_at + self.stale_ttl:
+                self._data.move_to_end(key)
+                self.stale_hits += 1
+                return self.STALE, value
+            del self._data[key]
+        self.misses += 1
+        return self.MISS, None
+
+    def set(self, key: Hashable, value: Any, ttl: float):
+        if self.maxsize <= 0:
+            return
+        self._data[key] = (value, self._clock() + ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
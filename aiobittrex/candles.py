@@ -0,0 +1,276 @@
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime, timezone
+from time import time
+from typing import Dict, List, Optional, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ('O', 'H', 'L', 'C', 'V', 'BV')
+
+if np is not None:
+    CANDLE_DTYPE = np.dtype([('T', 'datetime64[s]')] + [(f, 'f8') for f in FIELDS])
+else:
+    CANDLE_DTYPE = None
+
+INTERVALS = {
+    'oneMin': 60,
+    'fiveMin': 300,
+    'thirtyMin': 1800,
+    'hour': 3600,
+    'day': 86400
+}
+
+
+class Candles:
+    """Candles as a NumPy structured array (T: datetime64[s], O/H/L/C/V/BV: float64), sorted by time.
+
+    A column is available as candles['C'], the whole array as candles.data.
+    With maxlen set, only the latest maxlen candles are kept, so a rolling window can be maintained
+    by merging get_latest_candle results.
+    """
+
+    def __init__(self, data=None, maxlen: Optional[int] = None):
+        if np is None:
+            raise ImportError("Columnar candles require numpy: pip install aiobittrex[numpy]")
+        self.maxlen = maxlen
+        self.data = np.empty(0, dtype=CANDLE_DTYPE) if data is None else data
+        self._trim()
+
+    @classmethod
+    def from_records(cls, records: List[Dict], maxlen: Optional[int] = None) -> 'Candles':
+        return cls(data=cls.parse(records), maxlen=maxlen)
+
+    @staticmethod
+    def parse(records: List[Dict]):
+        """Convert GetTicks records to a structured array, timestamps are parsed by NumPy in one call."""
+        n = len(records)
+        data = np.empty(n, dtype=CANDLE_DTYPE)
+        data['T'] = np.array([r['T'] for r in records], dtype='datetime64[s]')
+        for field in FIELDS:
+            data[field] = np.fromiter([r[field] for r in records], dtype='f8', count=n)
+        if n > 1 and (data['T'][1:] < data['T'][:-1]).any():
+            data.sort(order='T', kind='stable')
+        return data
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, field: str):
+        return self.data[field]
+
+    def merge(self, candles: Union['Candles', List[Dict], Dict]) -> 'Candles':
+        """Merge newer (or updated) candles, a candle with a known timestamp replaces the old one."""
+        if isinstance(candles, Candles):
+            other = candles.data
+        else:
+            other = self.parse([candles] if isinstance(candles, dict) else candles)
+        if not len(other):
+            return self
+
+        data = self.data
+        times = data['T']
+        first, last = other['T'][0], other['T'][-1]
+        if len(data) and first == times[-1] and len(other) == 1:
+            # the latest candle was updated, the most common case
+            data[-1] = other[0]
+            return self
+
+        start = np.searchsorted(times, first, side='left')
+        end = np.searchsorted(times, last, side='right')
+        self.data = np.concatenate((data[:start], other, data[end:]))
+        self._trim()
+        return self
+
+    def _trim(self):
+        if self.maxlen is not None and len(self.data) > self.maxlen:
+            self.data = self.data[-self.maxlen:].copy()
+
+    def to_list(self) -> List[Dict]:
+        """Back to GetTicks records."""
+        return [
+            {'T': t.isoformat(), 'O': o, 'H': h, 'L': l, 'C': c, 'V': v, 'BV': bv}
+            for t, o, h, l, c, v, bv in self.data.tolist()
+        ]
+
+
+def _format_time(ts: int) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+
+
+def _parse_time(t: str) -> int:
+    return int(datetime.strptime(t[:19], '%Y-%m-%dT%H:%M:%S').replace(tzinfo=timezone.utc).timestamp())
+
+
+class CandleBuilder:
+    """OHLCV candles aggregated locally from listen_market (uE) fills.
+
+    Candles have the GetTicks format (O/H/L/C/V/BV and T, the interval start time),
+    V is the sum of fill quantities and BV the sum of quantity * rate.
+    A candle is closed by the first fill of a later interval or by flush() once its interval is over,
+    the latest `history` closed candles are kept per market and interval.
+    """
+
+    def __init__(self, intervals=('oneMin', 'fiveMin', 'hour', 'day'), history: int = 1000):
+        self.intervals = {name: INTERVALS[name] for name in intervals}
+        self.history = history
+        self.late = 0
+        self._closed = {}
+        self._current = {}
+        self._nonces = {}
+        self._next_close = None
+
+    def get(self, market: str, interval: str) -> List[Dict]:
+        """Closed candles and the current one, oldest first."""
+        candles = list(self._closed.get((market, interval), ()))
+        current = self._current.get((market, interval))
+        if current is not None:
+            candles.append(current[1])
+        return candles
+
+    def current(self, market: str, interval: str) -> Optional[Dict]:
+        current = self._current.get((market, interval))
+        return current and current[1]
+
+    def seed(self, market: str, interval: str, candles: List[Dict]):
+        """Load GetTicks history, candles already built from fills take precedence.
+
+        If nothing was built yet and the latest REST candle interval is not over, it becomes the current candle.
+
+        A REST candle for the interval being built is merged into it approximately:
+        the open is taken from REST, high/low are extended, volumes are the larger ones.
+        """
+        key = (market, interval)
+        current = self._current.get(key)
+        closed = self._closed.get(key)
+        start = current[0] if current is not None else (_parse_time(closed[0]['T']) if closed else None)
+        history = deque(maxlen=self.history)
+        for candle in candles or ():
+            candle_start = _parse_time(candle['T'])
+            if start is None or candle_start < start:
+                history.append(dict(candle))
+            elif current is not None and candle_start == current[0]:
+                bar = current[1]
+                bar['O'] = candle['O']
+                bar['H'] = max(bar['H'], candle['H'])
+                bar['L'] = min(bar['L'], candle['L'])
+                bar['V'] = max(bar['V'], candle['V'])
+                bar['BV'] = max(bar['BV'], candle['BV'])
+        if current is None and history:
+            # the latest REST candle may be still open
+            candle_start = _parse_time(history[-1]['T'])
+            end = candle_start + self.intervals[interval]
+            if end > time():
+                self._current[key] = (candle_start, history.pop())
+                if self._next_close is None or end < self._next_close:
+                    self._next_close = end
+        history.extend(closed or ())
+        self._closed[key] = history
+
+    def add_fill(self, market: str, rate: float, quantity: float, time_stamp: int) -> List[Tuple[str, str, Dict]]:
+        """Add a fill (time_stamp in milliseconds), returns closed candles: [(market, interval, candle)]."""
+        closed = []
+        ts = time_stamp // 1000
+        for interval, seconds in self.intervals.items():
+            key = (market, interval)
+            start = ts - ts % seconds
+            current = self._current.get(key)
+            if current is not None and start != current[0]:
+                if start < current[0]:
+                    self.late += 1
+                    continue
+                self._close(key, current[1])
+                closed.append((market, interval, current[1]))
+                current = None
+            if current is None:
+                self._current[key] = (start, {
+                    'O': rate, 'H': rate, 'L': rate, 'C': rate,
+                    'V': quantity, 'T': _format_time(start), 'BV': quantity * rate
+                })
+                end = start + seconds
+                if self._next_close is None or end < self._next_close:
+                    self._next_close = end
+            else:
+                bar = current[1]
+                if rate > bar['H']:
+                    bar['H'] = rate
+                elif rate < bar['L']:
+                    bar['L'] = rate
+                bar['C'] = rate
+                bar['V'] += quantity
+                bar['BV'] += quantity * rate
+        return closed
+
+    def apply(self, delta: Dict) -> List[Tuple[str, str, Dict]]:
+        """Add fills from a (translated) exchange delta, deltas not newer than the last one are skipped."""
+        market = delta['market_name']
+        nonce = delta.get('nonce')
+        if nonce is not None:
+            if nonce <= self._nonces.get(market, -1):
+                return []
+            self._nonces[market] = nonce
+        closed = []
+        for fill in delta.get('fills') or ():
+            closed.extend(self.add_fill(market, fill['rate'], fill['quantity'], fill['time_stamp']))
+        return closed
+
+    def flush(self, now: Optional[float] = None) -> List[Tuple[str, str, Dict]]:
+        """Close candles whose interval is over, returns closed candles."""
+        now = time() if now is None else now
+        if self._next_close is None or now < self._next_close:
+            return []
+        closed = []
+        next_close = None
+        for key, (start, bar) in list(self._current.items()):
+            end = start + self.intervals[key[1]]
+            if end <= now:
+                del self._current[key]
+                self._close(key, bar)
+                closed.append((key[0], key[1], bar))
+            elif next_close is None or end < next_close:
+                next_close = end
+        self._next_close = next_close
+        return closed
+
+    def _close(self, key, bar: Dict):
+        history = self._closed.get(key)
+        if history is None:
+            history = self._closed[key] = deque(maxlen=self.history)
+        history.append(bar)
+
+    async def listen(self, socket, markets, api=None, **queue_options):
+        """Aggregate market fills, yields closed candles: (market, interval, candle).
+
+        If api (BittrexAPI) is passed, history is requested with get_candles in background.
+        """
+        seeds = []
+        if api is not None:
+            for market in markets:
+                for interval in self.intervals:
+                    seed = asyncio.ensure_future(api.get_candles(market, interval))
+                    seed.add_done_callback(lambda f, m=market, i=interval: self._on_seed(m, i, f))
+                    seeds.append(seed)
+        try:
+            async for delta in socket.listen_market(markets, **queue_options):
+                for event in self.apply(delta):
+                    yield event
+                for event in self.flush():
+                    yield event
+        finally:
+            for seed in seeds:
+                seed.cancel()
+
+    def _on_seed(self, market: str, interval: str, future):
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            logger.error('Candles seed failed for %s %s: %s', market, interval, future.exception())
+            return
+        self.seed(market, interval, future.result())
@@ -0,0 +1,107 @@
+import json
+from base64 import b64decode
+from time import perf_counter
+from zlib import decompress, error as ZlibError, MAX_WBITS
+
+from .translate import TRANSLATORS, TYPED_TRANSLATORS, replace_keys
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+JSON_BACKENDS = {
+    'json': json.loads
+}
+if ujson is not None:
+    JSON_BACKENDS['ujson'] = ujson.loads
+if orjson is not None:
+    JSON_BACKENDS['orjson'] = orjson.loads
+
+
+def default_backend() -> str:
+    for name in ('orjson', 'ujson', 'json'):
+        if name in JSON_BACKENDS:
+            return name
+
+
+class Codec:
+    """Socket frames and payloads decoder.
+
+    Payloads are base64 encoded deflate streams, the codec remembers the zlib framing
+    (raw deflate or zlib headers) that worked last time and tries it first.
+    Inflated bytes are passed to the JSON parser as is.
+    """
+
+    def __init__(self, backend: str = None):
+        self.backend = backend or default_backend()
+        try:
+            self.loads = JSON_BACKENDS[self.backend]
+        except KeyError:
+            raise ValueError(f'JSON backend {self.backend!r} is not available.')
+        self._wbits = -MAX_WBITS
+        self.frames = 0
+        self.frame_bytes = 0
+        self.payloads = 0
+        self.payload_bytes = 0
+        self.inflated_bytes = 0
+        self.decode_time = 0.0
+
+    def load_frame(self, data):
+        self.frames += 1
+        self.frame_bytes += len(data)
+        return self.loads(data)
+
+    def decode(self, payload):
+        started = perf_counter()
+        compressed = b64decode(payload, validate=True)
+        try:
+            inflated = decompress(compressed, self._wbits)
+        except ZlibError:
+            self._wbits = MAX_WBITS if self._wbits < 0 else -MAX_WBITS
+            inflated = decompress(compressed, self._wbits)
+        result = self.loads(inflated)
+        self.payloads += 1
+        self.payload_bytes += len(payload)
+        self.inflated_bytes += len(inflated)
+        self.decode_time += perf_counter() - started
+        return result
+
+    def stats(self) -> dict:
+        return {
+            'backend': self.backend,
+            'frames': self.frames,
+            'frame_bytes': self.frame_bytes,
+            'payloads': self.payloads,
+            'payload_bytes': self.payload_bytes,
+            'inflated_bytes': self.inflated_bytes,
+            'decode_time': self.decode_time,
+            'payloads_per_second': self.payloads / self.decode_time if self.decode_time else 0.0
+        }
+
+
+_worker_codecs = {}
+
+
+def decode_rows(rows, backend=None, typed=False):
+    """Decode and translate batched callback payloads, runs in a decode executor worker.
+
+    :param rows: [(callback, [payload, ...]), ...]
+    :param typed: translate into aiobittrex.records types
+    :return: [[message, ...], ...] in the rows order
+    """
+    codec = _worker_codecs.get(backend)
+    if codec is None:
+        codec = _worker_codecs[backend] = Codec(backend=backend)
+    translators = TYPED_TRANSLATORS if typed else TRANSLATORS
+    result = []
+    for callback, payloads in rows:
+        translate = translators.get(callback, replace_keys)
+        result.append([translate(codec.decode(p)) for p in payloads])
+    return result
@@ -0,0 +1,472 @@
+import asyncio
+import json
+import logging
+import random
+from collections import deque
+from itertools import count
+from time import monotonic, perf_counter, time
+
+import aiohttp
+
+from .codec import decode_rows
+from .errors import BittrexSocketError, BittrexSocketConnectionClosed, BittrexSocketConnectionError
+from .metrics import Metrics, server_time
+
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """Async iterator over decoded messages for one or more callback types (uE, uS, uL, uB, uO).
+
+    Messages are buffered in a bounded queue, when the queue is full:
+    - block: the connection reader waits for the consumer (all the streams on the connection are delayed)
+    - drop_oldest: the oldest message is dropped
+    - conflate: a message replaces (or is merged into) the queued message with the same key,
+      the oldest message is dropped if there is no such message
+    """
+    BLOCK = 'block'
+    DROP_OLDEST = 'drop_oldest'
+    CONFLATE = 'conflate'
+
+    def __init__(self, callbacks, markets=None, maxsize=10000, policy=BLOCK, key=None, merge=None):
+        if policy not in (self.BLOCK, self.DROP_OLDEST, self.CONFLATE):
+            raise ValueError(f'Unknown queue policy: {policy!r}.')
+        if policy == self.CONFLATE and key is None:
+            raise ValueError('Conflate policy requires a key.')
+        self.callbacks = tuple(callbacks)
+        self.markets = set(markets) if markets else None
+        self.maxsize = maxsize
+        self.policy = policy
+        self.key = key
+        self.merge = merge
+        self.invocations = []
+        self.authenticated = False
+        self.on_reconnect = None
+        self.max_depth = 0
+        self.dropped = 0
+        self.conflated = 0
+        self._items = {} if policy == self.CONFLATE else deque()
+        self._exception = None
+        self._closed = False
+        self._getter = None
+        self._writable = None
+
+    @property
+    def depth(self) -> int:
+        return len(self._items)
+
+    def full(self) -> bool:
+        return 0 < self.maxsize <= len(self._items)
+
+    def stats(self) -> dict:
+        return {
+            'callbacks': self.callbacks,
+            'policy': self.policy,
+            'maxsize': self.maxsize,
+            'depth': self.depth,
+            'max_depth': self.max_depth,
+            'dropped': self.dropped,
+            'conflated': self.conflated
+        }
+
+    def matches(self, message) -> bool:
+        return self.markets is None or message.get('market_name') in self.markets
+
+    def put(self, message) -> bool:
+        """Queue a message, returns False if the queue is full and the writer should wait (block policy)."""
+        if self._closed:
+            return True
+        items = self._items
+
+        if self.policy == self.CONFLATE:
+            key = self.key(message)
+            if key in items:
+                items[key] = self.merge(items[key], message) if self.merge else message
+                self.conflated += 1
+                self._wakeup()
+                return True
+            if self.full():
+                del items[next(iter(items))]
+                self.dropped += 1
+            items[key] = message
+        else:
+            if self.policy == self.DROP_OLDEST and self.full():
+                items.popleft()
+                self.dropped += 1
+            items.append(message)
+
+        if len(items) > self.max_depth:
+            self.max_depth = len(items)
+        self._wakeup()
+        return self.policy != self.BLOCK or not self.full()
+
+    def fail(self, exc: Exception):
+        self._exception = exc
+        self._wakeup()
+
+    def close(self):
+        """Stop accepting messages and release a blocked writer."""
+        self._closed = True
+        self._items.clear()
+        self._release_writer()
+
+    async def writable(self):
+        """Wait until the queue is not full."""
+        while self.full() and not self._closed:
+            self._writable = asyncio.get_event_loop().create_future()
+            await self._writable
+
+    def get_nowait(self):
+        items = self._items
+        if items:
+            if self.policy == self.CONFLATE:
+                message = items.pop(next(iter(items)))
+            else:
+                message = items.popleft()
+            self._release_writer()
+            return message
+        if self._exception is not None:
+            exc, self._exception = self._exception, None
+            raise exc
+        raise asyncio.QueueEmpty
+
+    def _wakeup(self):
+        if self._getter is not None and not self._getter.done():
+            self._getter.set_result(None)
+
+    def _release_writer(self):
+        if self._writable is not None and not self._writable.done() and not self.full():
+            self._writable.set_result(None)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while True:
+            try:
+                return self.get_nowait()
+            except asyncio.QueueEmpty:
+                self._getter = asyncio.get_event_loop().create_future()
+                await self._getter
+
+
+class SocketConnection:
+    """Single websocket shared by all BittrexSocket calls.
+
+    Hub invocations get unique ids and their replies (R) are routed to awaiting futures,
+    callback frames (M) are decoded once and fanned out to the subscriptions for the callback type.
+
+    With a decode executor (a process or thread pool), callback payloads are decoded in the executor
+    in batches and dispatched in the arrival order.
+
+    With reconnect enabled, a closed connection is re-negotiated with exponential backoff,
+    the session is re-authenticated if needed and the subscriptions invocations are replayed,
+    subscriptions iterators are kept alive in the meantime.
+
+    With a recorder (FrameRecorder), received text frames are recorded as is.
+    Frame, message, decode time and lag metrics are reported to metrics (see aiobittrex.metrics).
+    """
+
+    def __init__(
+            self,
+            socket,
+            reconnect=False,
+            backoff=0.5,
+            max_backoff=30.0,
+            max_attempts=None,
+            decode_executor=None,
+            batch_size=256,
+            recorder=None,
+            metrics=None
+    ):
+        self._socket = socket
+        self.reconnect = reconnect
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts
+        self.reconnects = 0
+        self.reconnect_latency = None
+        self._ws = None
+        self._runner = None
+        self._online = None
+        self._closing = False
+        self._invocation_ids = count(start=1)
+        self._replies = {}
+        self._subscriptions = {}
+        self.decode_executor = decode_executor
+        self.batch_size = batch_size
+        self._batch = []
+        self._flush_handle = None
+        self._decoded = asyncio.Queue()
+        self._dispatcher = None
+        self._blocked = set()
+        self.recorder = recorder
+        self.metrics = metrics or Metrics()
+
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None and not self._ws.closed
+
+    async def connect(self):
+        if self._runner is None or self._runner.done():
+            self._closing = False
+            self._online = asyncio.get_event_loop().create_future()
+            self._runner = asyncio.ensure_future(self._run())
+        return await asyncio.shield(self._online)
+
+    async def close(self):
+        self._closing = True
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            self._dispatcher = None
+        if self._runner is None:
+            return
+        if self._ws is not None:
+            await self._ws.close()
+        else:
+            self._runner.cancel()
+        try:
+            await self._runner
+        except asyncio.CancelledError:
+            pass
+        self._runner = None
+
+    async def invoke(self, method, *args):
+        """Invoke a hub method and wait for the result."""
+        return await self._call(await self.connect(), method, args)
+
+    async def _call(self, ws, method, args):
+        invocation_id = next(self._invocation_ids)
+        future = self._replies[invocation_id] = asyncio.get_event_loop().create_future()
+        try:
+            await ws.send_str(json.dumps({
+                'H': self._socket.SOCKET_HUB,
+                'M': method,
+                'A': list(args),
+                'I': invocation_id
+            }))
+            return await future
+        finally:
+            self._replies.pop(invocation_id, None)
+
+    async def _run(self):
+        attempt = 0
+        disconnected_at = None
+
+        while True:
+            try:
+                ws = await self._socket.create_ws(refresh=disconnected_at is not None)
+            except (aiohttp.ClientError, OSError, asyncio.TimeoutError) as e:
+                logger.error('Websocket connection failed: %s', e)
+                exc = BittrexSocketConnectionError(e)
+            else:
+                reader = asyncio.ensure_future(self._read(ws))
+                try:
+                    if disconnected_at is not None:
+                        await self._replay(ws)
+                except (BittrexSocketError, aiohttp.ClientError, ConnectionError) as e:
+                    logger.error('Subscriptions replay failed: %s', e)
+                    await ws.close()
+                    exc = await reader
+                else:
+                    self._ws = ws
+                    if not self._online.done():
+                        self._online.set_result(ws)
+                    if disconnected_at is not None:
+                        self.reconnects += 1
+                        self.reconnect_latency = monotonic() - disconnected_at
+                        logger.info('Websocket reconnected in %.3fs.', self.reconnect_latency)
+                        disconnected_at = None
+                        self._on_reconnect()
+                    attempt = 0
+                    exc = await reader
+                    self._ws = None
+                    self._online = asyncio.get_event_loop().create_future()
+
+            if self._closing or not self.reconnect or (self.max_attempts and attempt >= self.max_attempts):
+                self._fail_subscriptions(exc)
+                if not self._online.done():
+                    self._online.set_exception(exc)
+                    self._online.exception()  # retrieved by the waiters, if any
+                return
+
+            if disconnected_at is None:
+                disconnected_at = monotonic()
+            delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1)) * random.uniform(0.5, 1) if attempt else 0
+            attempt += 1
+            logger.warning('Reconnecting in %.3fs, attempt %s.', delay, attempt)
+            await asyncio.sleep(delay)
+
+    async def _replay(self, ws):
+        subscriptions = self._active_subscriptions()
+
+        if any(s.authenticated for s in subscriptions):
+            await self._socket._authenticate(invoke=lambda method, *args: self._call(ws, method, args))
+
+        replayed = set()
+        for subscription in subscriptions:
+            for method, args in subscription.invocations:
+                if (method, args) not in replayed:
+                    replayed.add((method, args))
+                    await self._call(ws, method, args)
+
+    def _on_reconnect(self):
+        for subscription in self._active_subscriptions():
+            if subscription.on_reconnect is not None:
+                subscription.on_reconnect()
+
+    def _active_subscriptions(self):
+        result = []
+        for subscriptions in self._subscriptions.values():
+            for subscription in subscriptions:
+                if subscription not in result:
+                    result.append(subscription)
+        return result
+
+    def subscribe(self, callbacks, markets=None, **queue_options) -> Subscription:
+        """Subscribe to callback types, see Subscription for the queue options (maxsize, policy, key, merge)."""
+        subscription = Subscription(callbacks=callbacks, markets=markets, **queue_options)
+        for callback in subscription.callbacks:
+            self._subscriptions.setdefault(callback, []).append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        for callback in subscription.callbacks:
+            subscriptions = self._subscriptions.get(callback)
+            if subscriptions and subscription in subscriptions:
+                subscriptions.remove(subscription)
+                if not subscriptions:
+                    del self._subscriptions[callback]
+        subscription.close()
+
+    def stats(self) -> list:
+        return [s.stats() for s in self._active_subscriptions()]
+
+    async def _read(self, ws) -> Exception:
+        exc = BittrexSocketConnectionClosed()
+        try:
+            async for msg in ws:
+                if msg.type == aiohttp.WSMsgType.TEXT:
+                    if self.recorder is not None:
+                        self.recorder.write(msg.data)
+                    self._handle_frame(msg.data)
+                    if self._blocked:
+                        await self._wait_blocked()
+                elif msg.type == aiohttp.WSMsgType.ERROR:
+                    logger.error('Websocket connection error: %s', msg)
+                    exc = BittrexSocketConnectionError()
+                    break
+                else:
+                    logger.warning('Message: %s', msg.type)
+        except Exception as e:
+            logger.exception('Websocket read failed.')
+            exc = BittrexSocketConnectionError(e)
+        if not ws.closed:
+            await ws.close()
+        logger.warning('Websocket connection closed: %s', ws.close_code)
+        self._fail_replies(exc)
+        return exc
+
+    def _fail_replies(self, exc: Exception):
+        for future in self._replies.values():
+            if not future.done():
+                future.set_exception(exc)
+
+    def _fail_subscriptions(self, exc: Exception):
+        for subscription in self._active_subscriptions():
+            subscription.fail(exc)
+
+    def _handle_frame(self, data):
+        frame = self._socket.codec.load_frame(data)
+        measure = self.metrics.enabled
+        if measure:
+            self.metrics.increment('socket_frames_total')
+
+        if 'I' in frame:
+            future = self._replies.get(int(frame['I']))
+            if future is not None and not future.done():
+                if 'E' in frame:
+                    future.set_exception(BittrexSocketError(frame['E']))
+                else:
+                    future.set_result(frame.get('R'))
+        elif 'E' in frame:
+            logger.error('Socket error: %s', frame['E'])
+
+        for row in frame.get('M') or ():
+            callback = row['M']
+            if callback not in self._subscriptions:
+                if measure:
+                    self.metrics.increment('socket_messages_total', len(row['A']), {'callback': callback})
+                continue
+            if self.decode_executor is None:
+                decode = self._socket.decode_message
+                if measure:
+                    started = perf_counter()
+                    messages = [decode(callback, a) for a in row['A']]
+                    self._measure(callback, messages, perf_counter() - started)
+                else:
+                    messages = [decode(callback, a) for a in row['A']]
+                self._dispatch(callback, messages)
+            else:
+                self._batch.append((callback, row['A']))
+
+        if self._batch:
+            if len(self._batch) >= self.batch_size:
+                self._flush_batch()
+            elif self._flush_handle is None:
+                self._flush_handle = asyncio.get_event_loop().call_soon(self._flush_batch)
+
+    def _flush_batch(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        rows, self._batch = self._batch, []
+        loop = asyncio.get_event_loop()
+        future = loop.run_in_executor(
+            self.decode_executor, decode_rows, rows, self._socket.codec.backend, self._socket.typed
+        )
+        self._decoded.put_nowait((rows, future))
+        if self._dispatcher is None:
+            self._dispatcher = asyncio.ensure_future(self._dispatch_decoded())
+
+    async def _dispatch_decoded(self):
+        while True:
+            rows, future = await self._decoded.get()
+            try:
+                results = await future
+            except Exception:
+                logger.exception('Payloads decoding failed.')
+                continue
+            measure = self.metrics.enabled
+            for (callback, _), messages in zip(rows, results):
+                if measure:
+                    self._measure(callback, messages)
+                self._dispatch(callback, messages)
+            if self._blocked:
+                await self._wait_blocked()
+
+    def _measure(self, callback, messages, decode_time=None):
+        metrics = self.metrics
+        tags = {'callback': callback}
+        metrics.increment('socket_messages_total', len(messages), tags)
+        if decode_time is not None:
+            metrics.observe('socket_decode_seconds', decode_time, tags)
+        now = time()
+        for message in messages:
+            sent = server_time(callback, message)
+            if sent is not None:
+                metrics.observe('socket_lag_seconds', now - sent, tags)
+
+    def _dispatch(self, callback, messages):
+        subscriptions = self._subscriptions.get(callback)
+        if not subscriptions:
+            return
+        for message in messages:
+            for subscription in subscriptions:
+                if subscription.matches(message) and not subscription.put(message):
+                    self._blocked.add(subscription)
+
+    async def _wait_blocked(self):
+        while self._blocked:
+            await self._blocked.pop().writable()
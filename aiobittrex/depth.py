@@ -0,0 +1,140 @@
+from typing import Dict, List, Optional
+
+from .book import OrderBook
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class DepthSide:
+    """One side of an order book as contiguous arrays, best rate first.
+
+    Cumulative quantity and cost (quantity * rate) are precomputed, so fill queries are a binary search.
+    Queries accept a number or an array of sizes/percents, sizes that can not be filled give nan.
+    """
+
+    def __init__(self, rates, quantities, reverse: bool = False):
+        if np is None:
+            raise ImportError("Depth analytics require numpy: pip install aiobittrex[numpy]")
+        rates = np.asarray(rates, dtype='f8')
+        quantities = np.asarray(quantities, dtype='f8')
+        order = np.argsort(-rates if reverse else rates, kind='stable')
+        self.reverse = reverse
+        self.rates = rates[order]
+        self.quantities = quantities[order]
+        self.cum_quantity = np.cumsum(self.quantities)
+        self.cum_cost = np.cumsum(self.quantities * self.rates)
+
+    def __len__(self) -> int:
+        return len(self.rates)
+
+    @property
+    def best(self) -> Optional[float]:
+        return float(self.rates[0]) if len(self.rates) else None
+
+    @property
+    def total(self) -> float:
+        return float(self.cum_quantity[-1]) if len(self.rates) else 0.0
+
+    def cost(self, size):
+        """Cost (in the base currency) to fill size."""
+        size = np.asarray(size, dtype='f8')
+        n = len(self.rates)
+        if not n:
+            return self._result(np.where(size > 0, np.nan, 0.0))
+        i = np.searchsorted(self.cum_quantity, size, side='left')
+        filled = i < n
+        i = np.minimum(i, n - 1)
+        prev_quantity = np.where(i > 0, self.cum_quantity[i - 1], 0.0)
+        prev_cost = np.where(i > 0, self.cum_cost[i - 1], 0.0)
+        cost = prev_cost + (size - prev_quantity) * self.rates[i]
+        return self._result(np.where(filled, cost, np.nan))
+
+    def vwap(self, size):
+        """Average rate to fill size."""
+        size = np.asarray(size, dtype='f8')
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self._result(np.asarray(self.cost(size)) / size)
+
+    def impact(self, size):
+        """Price impact of filling size: relative distance between the average and the best rate, positive."""
+        if not len(self.rates):
+            return self._result(np.full(np.shape(size), np.nan))
+        best = self.rates[0]
+        impact = (np.asarray(self.vwap(size)) - best) / best
+        return self._result(-impact if self.reverse else impact)
+
+    def depth(self, percent):
+        """Quantity available within percent (0.01 is 1%) from the best rate."""
+        percent = np.asarray(percent, dtype='f8')
+        if not len(self.rates):
+            return self._result(np.zeros(percent.shape))
+        best = self.rates[0]
+        if self.reverse:
+            i = np.searchsorted(-self.rates, -best * (1 - percent), side='right')
+        else:
+            i = np.searchsorted(self.rates, best * (1 + percent), side='right')
+        return self._result(np.where(i > 0, self.cum_quantity[np.maximum(i, 1) - 1], 0.0))
+
+    @staticmethod
+    def _result(value):
+        value = np.asarray(value)
+        return float(value) if value.ndim == 0 else value
+
+
+class DepthBook:
+    """Order book snapshot for pre-trade analytics.
+
+    Buying consumes sells, selling consumes buys:
+    book.sells.vwap(10) is the average rate to buy 10, book.buys.impact(10) is the impact of selling 10.
+    """
+
+    def __init__(self, market: Optional[str], buys: DepthSide, sells: DepthSide):
+        self.market = market
+        self.buys = buys
+        self.sells = sells
+
+    @classmethod
+    def from_levels(cls, market: Optional[str], buys: List, sells: List, rate='rate', quantity='quantity'):
+        return cls(
+            market=market,
+            buys=DepthSide([level[rate] for level in buys], [level[quantity] for level in buys], reverse=True),
+            sells=DepthSide([level[rate] for level in sells], [level[quantity] for level in sells])
+        )
+
+    @classmethod
+    def from_state(cls, state: Dict, market: Optional[str] = None) -> 'DepthBook':
+        """From BittrexSocket.get_market result."""
+        return cls.from_levels(
+            market=market or state.get('market_name'),
+            buys=state.get('buys') or (),
+            sells=state.get('sells') or ()
+        )
+
+    @classmethod
+    def from_order_book(cls, order_book: Dict, market: Optional[str] = None) -> 'DepthBook':
+        """From BittrexAPI.get_order_book(market, order_type='both') result."""
+        return cls.from_levels(
+            market=market,
+            buys=order_book.get('buy') or (),
+            sells=order_book.get('sell') or (),
+            rate='Rate',
+            quantity='Quantity'
+        )
+
+    @classmethod
+    def from_book(cls, book: OrderBook, depth: Optional[int] = None) -> 'DepthBook':
+        """From a local OrderBook."""
+        return cls.from_levels(market=book.market, buys=book.buys.levels(depth), sells=book.sells.levels(depth))
+
+    def spread(self) -> Optional[float]:
+        if not len(self.buys) or not len(self.sells):
+            return None
+        return self.sells.best - self.buys.best
+
+
+def batch_query(books: List[DepthBook], side: str, query: str, values) -> Dict:
+    """Evaluate a query for many books: batch_query(books, 'sells', 'vwap', [1, 10, 100]) -> {market: array}."""
+    return {book.market: getattr(getattr(book, side), query)(values) for book in books}
@@ -20,6 +20,12 @@ class BittrexResponseError(BittrexRestError):
         return f'[{self.status}] {self.content!r}'
 
 
+class BittrexThrottledError(BittrexResponseError):
+    def __init__(self, status: int, content: str, retry_after: float = None):
+        super().__init__(status, content)
+        self.retry_after = retry_after
+
+
 class BittrexSocketError(BittrexError):
     pass
 
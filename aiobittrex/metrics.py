@@ -0,0 +1,134 @@
+"""Metrics hooks for the REST and socket paths.
+
+REST (tags: endpoint, e.g. v1.1/public/getticker):
+- request_wait_seconds - time waiting for the rate limiter (also tagged with priority)
+- request_seconds - HTTP round trip, response reading and parsing
+- response_bytes - response body size
+- request_errors_total - failed requests (also tagged with error, the exception class name)
+
+Socket (tags: callback, e.g. uE):
+- socket_frames_total - websocket text frames (no tags)
+- socket_messages_total - callback messages
+- socket_decode_seconds - payloads inflate, parsing and translation (not measured with a decode executor)
+- socket_lag_seconds - receive time minus the server time_stamp/updated field, includes clocks difference
+"""
+import socket
+from typing import Dict, Optional
+
+try:
+    import prometheus_client
+except ImportError:
+    prometheus_client = None
+
+
+class Metrics:
+    """No-op metrics sink, the default. Subclasses set enabled = True."""
+    enabled = False
+
+    def increment(self, name: str, value: float = 1, tags: Optional[Dict[str, str]] = None):
+        pass
+
+    def observe(self, name: str, value: float, tags: Optional[Dict[str, str]] = None):
+        """Histogram/timer value, durations are in seconds."""
+        pass
+
+
+class StatsDMetrics(Metrics):
+    """StatsD over UDP, tags in the DogStatsD format (name:value|type|#key:value).
+
+    Lines are buffered and sent in packets of up to max_packet bytes,
+    call flush() periodically (or on shutdown) to send the rest.
+    """
+    enabled = True
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8125, prefix: str = 'bittrex', max_packet: int = 1432):
+        self.address = (host, port)
+        self.prefix = prefix
+        self.max_packet = max_packet
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setblocking(False)
+        self._buffer = []
+        self._size = 0
+
+    def increment(self, name, value=1, tags=None):
+        self._add(f'{self.prefix}.{name}:{value}|c', tags)
+
+    def observe(self, name, value, tags=None):
+        if name.endswith('_seconds'):
+            self._add(f'{self.prefix}.{name[:-8]}:{value * 1000:.3f}|ms', tags)
+        else:
+            self._add(f'{self.prefix}.{name}:{value}|h', tags)
+
+    def _add(self, line: str, tags):
+        if tags:
+            line += '|#' + ','.join(f'{k}:{v}' for k, v in tags.items())
+        if self._size + len(line) + 1 > self.max_packet:
+            self.flush()
+        self._buffer.append(line)
+        self._size += len(line) + 1
+
+    def flush(self):
+        if not self._buffer:
+            return
+        data = '\n'.join(self._buffer).encode()
+        self._buffer.clear()
+        self._size = 0
+        try:
+            self._socket.sendto(data, self.address)
+        except OSError:
+            pass  # metrics are best effort
+
+    def close(self):
+        self.flush()
+        self._socket.close()
+
+
+class PrometheusMetrics(Metrics):
+    """prometheus_client counters and histograms, created on first use with the tag names as labels."""
+    enabled = True
+
+    def __init__(self, registry=None, prefix: str = 'bittrex', buckets: Optional[Dict[str, tuple]] = None):
+        if prometheus_client is None:
+            raise ImportError("Prometheus metrics require prometheus_client: pip install prometheus_client")
+        self.registry = registry if registry is not None else prometheus_client.REGISTRY
+        self.prefix = prefix
+        self.buckets = buckets or {}
+        self._metrics = {}
+
+    def _get(self, cls, name, tags, **kwargs):
+        key = (name, tuple(tags) if tags else ())
+        metric = self._metrics.get(key)
+        if metric is None:
+            metric = self._metrics[key] = cls(
+                f'{self.prefix}_{name}',
+                name.replace('_', ' '),
+                labelnames=key[1],
+                registry=self.registry,
+                **kwargs
+            )
+        return metric.labels(**tags) if tags else metric
+
+    def increment(self, name, value=1, tags=None):
+        self._get(prometheus_client.Counter, name, tags).inc(value)
+
+    def observe(self, name, value, tags=None):
+        kwargs = {'buckets': self.buckets[name]} if name in self.buckets else {}
+        self._get(prometheus_client.Histogram, name, tags, **kwargs).observe(value)
+
+
+def server_time(callback: str, message: Dict) -> Optional[float]:
+    """The latest server timestamp (seconds) in a translated socket message, if any."""
+    try:
+        if callback == 'uE':
+            fills = message['fills']
+            return max(f['time_stamp'] for f in fills) / 1000 if fills else None
+        if callback == 'uS':
+            deltas = message['deltas']
+            return max(d['time_stamp'] for d in deltas) / 1000 if deltas else None
+        if callback == 'uB':
+            return message['delta']['updated'] / 1000
+        if callback == 'uO':
+            return message['order']['updated'] / 1000
+    except (KeyError, TypeError):
+        pass
+    return None
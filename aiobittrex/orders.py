@@ -0,0 +1,196 @@
+import asyncio
+import logging
+from collections import deque, OrderedDict
+from typing import Dict, Optional, Tuple
+
+import aiohttp
+
+from .account import AccountState, ORDER_KEYS, _rest_to_socket
+from .errors import BittrexError
+
+
+logger = logging.getLogger(__name__)
+
+
+class TrackedOrder:
+    """Order lifecycle: async iterator over (type, order) events and wait() for the closed order.
+
+    Events types are OrderTracker.OPEN, PARTIAL, FILL and CANCEL, orders are in the socket format.
+    The iterator stops after a FILL or CANCEL event.
+    """
+
+    def __init__(self, order_uuid: str):
+        self.order_uuid = order_uuid
+        self.order = None
+        self.closed = False
+        self._updated = None
+        self._events = deque()
+        self._getter = None
+        self._done = None
+
+    def _add(self, event_type: int, order: Dict):
+        self.order = order
+        self._events.append((event_type, order))
+        if event_type in (OrderTracker.FILL, OrderTracker.CANCEL):
+            self.closed = True
+            if self._done is not None and not self._done.done():
+                self._done.set_result(order)
+        if self._getter is not None and not self._getter.done():
+            self._getter.set_result(None)
+
+    async def wait(self, timeout: float = None) -> Dict:
+        """Wait until the order is filled or cancelled, returns the last order state."""
+        if self.closed:
+            return self.order
+        if self._done is None:
+            self._done = asyncio.get_event_loop().create_future()
+        return await asyncio.wait_for(asyncio.shield(self._done), timeout)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Tuple[int, Dict]:
+        while not self._events:
+            if self.closed:
+                raise StopAsyncIteration
+            self._getter = asyncio.get_event_loop().create_future()
+            await self._getter
+        return self._events.popleft()
+
+
+class OrderTracker:
+    """Matches listen_account order deltas (uO) to orders by order_uuid.
+
+    Deltas received before the order is tracked (the socket may be faster than the REST response)
+    are kept for the latest `unmatched` orders and replayed on track().
+    While the socket is down (or run() was not started) open orders are polled with get_order
+    every poll_interval seconds, tracked orders are also polled once after a socket reconnect.
+    """
+    OPEN = AccountState.OPEN
+    PARTIAL = AccountState.PARTIAL
+    FILL = AccountState.FILL
+    CANCEL = AccountState.CANCEL
+
+    def __init__(self, api=None, poll_interval: float = 2.0, unmatched: int = 1000):
+        self.api = api
+        self.poll_interval = poll_interval
+        self.polls = 0
+        self._orders = {}
+        self._unmatched = OrderedDict()
+        self._unmatched_size = unmatched
+        self._socket = None
+        self._poller = None
+
+    def __contains__(self, order_uuid) -> bool:
+        return order_uuid in self._orders
+
+    def get(self, order_uuid: str) -> Optional[TrackedOrder]:
+        return self._orders.get(order_uuid)
+
+    def track(self, order_uuid: str) -> TrackedOrder:
+        tracked = self._orders.get(order_uuid)
+        if tracked is None:
+            tracked = self._orders[order_uuid] = TrackedOrder(order_uuid)
+            for message in self._unmatched.pop(order_uuid, ()):
+                self._apply(tracked, message)
+            self._start_polling()
+        return tracked
+
+    def untrack(self, order_uuid: str):
+        self._orders.pop(order_uuid, None)
+
+    async def buy_limit(self, market, quantity, rate) -> TrackedOrder:
+        result = await self.api.buy_limit(market, quantity, rate)
+        return self.track(result['uuid'])
+
+    async def sell_limit(self, market, quantity, rate) -> TrackedOrder:
+        result = await self.api.sell_limit(market, quantity, rate)
+        return self.track(result['uuid'])
+
+    def apply(self, message: Dict) -> bool:
+        """Apply a listen_account message, returns False if it is not an order delta of a tracked order."""
+        order = message.get('order')
+        if order is None:
+            return False
+        tracked = self._orders.get(order['order_uuid'])
+        if tracked is None:
+            buffered = self._unmatched.setdefault(order['order_uuid'], [])
+            buffered.append(message)
+            if len(self._unmatched) > self._unmatched_size:
+                self._unmatched.popitem(last=False)
+            return False
+        return self._apply(tracked, message)
+
+    def _apply(self, tracked: TrackedOrder, message: Dict) -> bool:
+        order = message['order']
+        updated = order.get('updated')
+        if tracked.closed or (updated is not None and tracked._updated is not None and updated < tracked._updated):
+            return False
+        tracked._updated = updated
+        tracked._add(message['type'], order)
+        if tracked.closed:
+            self.untrack(tracked.order_uuid)
+        return True
+
+    def apply_rest(self, order: Dict) -> bool:
+        """Apply a get_order result, the event type is derived from the order state change."""
+        order = _rest_to_socket(order, ORDER_KEYS)
+        tracked = self._orders.get(order['order_uuid'])
+        if tracked is None or tracked.closed:
+            return False
+        remaining = order['quantity_remaining']
+        if not order['is_open']:
+            event_type = self.FILL if not remaining else self.CANCEL
+        elif tracked.order is None:
+            event_type = self.OPEN if remaining == order['quantity'] else self.PARTIAL
+        elif remaining != tracked.order.get('quantity_remaining'):
+            event_type = self.PARTIAL
+        else:
+            return False
+        tracked._add(event_type, order)
+        if tracked.closed:
+            self.untrack(tracked.order_uuid)
+        return True
+
+    async def run(self, socket, **queue_options):
+        """Track orders with the socket, runs until the socket subscription is closed."""
+        self._socket = socket
+        reconnects = socket.connection.reconnects
+        try:
+            async for message in socket.listen_account(**queue_options):
+                if socket.connection.reconnects != reconnects:
+                    reconnects = socket.connection.reconnects
+                    asyncio.ensure_future(self.poll())
+                self.apply(message)
+        finally:
+            self._socket = None
+
+    async def poll(self):
+        """Poll tracked orders with get_order."""
+        for order_uuid in list(self._orders):
+            try:
+                order = await self.api.get_order(order_uuid)
+            except (BittrexError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning('Order %s polling failed: %s', order_uuid, e)
+                continue
+            self.polls += 1
+            if order:
+                self.apply_rest(order)
+
+    def _socket_online(self) -> bool:
+        return self._socket is not None and self._socket.connection.connected
+
+    def _start_polling(self):
+        if self.api is not None and (self._poller is None or self._poller.done()):
+            self._poller = asyncio.ensure_future(self._poll_periodically())
+
+    async def _poll_periodically(self):
+        while self._orders:
+            await asyncio.sleep(self.poll_interval)
+            if not self._socket_online():
+                await self.poll()
+
+    def close(self):
+        if self._poller is not None:
+            self._poller.cancel()
+            self._poller = None
@@ -0,0 +1,112 @@
+import asyncio
+import mmap
+import os
+import struct
+from time import monotonic, time
+from typing import Iterator, Optional, Tuple
+
+
+MAGIC = b'ABXREC01'
+RECORD = struct.Struct('<dI')
+
+
+class FrameRecorder:
+    """Appends raw websocket frames with receive timestamps to a file.
+
+    File format: MAGIC, then records of (timestamp: float64, length: uint32, frame: utf-8 bytes),
+    little endian. The file is only appended to, a record cut by a crash is ignored by the reader.
+    """
+
+    def __init__(self, path: str, buffering: int = 1 << 16):
+        self.path = path
+        self.frames = 0
+        self.bytes = 0
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, 'ab', buffering=buffering)
+        if new:
+            self._file.write(MAGIC)
+
+    def write(self, frame, timestamp: Optional[float] = None):
+        if isinstance(frame, str):
+            frame = frame.encode()
+        self._file.write(RECORD.pack(time() if timestamp is None else timestamp, len(frame)))
+        self._file.write(frame)
+        self.frames += 1
+        self.bytes += len(frame)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FrameReader:
+    """Memory mapped recorded frames, iterates over (timestamp, frame bytes)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f'Not a frames recording: {path}.')
+
+    def __iter__(self) -> Iterator[Tuple[float, bytes]]:
+        data = self._mmap
+        size = len(data)
+        header = RECORD.size
+        offset = len(MAGIC)
+        unpack = RECORD.unpack_from
+        while offset + header <= size:
+            timestamp, length = unpack(data, offset)
+            offset += header
+            if offset + length > size:
+                break
+            yield timestamp, data[offset:offset + length]
+            offset += length
+
+    def close(self):
+        if isinstance(self._mmap, mmap.mmap):
+            self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+async def replay(connection, frames, speed: Optional[float] = None, yield_every: int = 100) -> int:
+    """Push recorded frames through the connection decode and dispatch path, returns the number of frames.
+
+    :param connection: SocketConnection, consume the frames with connection.subscribe(...)
+    :param frames: FrameReader or an iterable of (timestamp, frame)
+    :param speed: None - as fast as possible, 1.0 - the recorded speed, 10.0 - 10 times faster
+    :param yield_every: let the consumers run every yield_every frames when replaying as fast as possible
+    """
+    started = first = None
+    n = 0
+    for n, (timestamp, frame) in enumerate(frames, start=1):
+        if speed is not None:
+            if first is None:
+                first, started = timestamp, monotonic()
+            delay = (timestamp - first) / speed - (monotonic() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        connection._handle_frame(frame)
+        if connection._blocked:
+            await connection._wait_blocked()
+        elif speed is None and n % yield_every == 0:
+            await asyncio.sleep(0)
+    if connection._batch:
+        connection._flush_batch()
+    await asyncio.sleep(0)
+    return n
@@ -0,0 +1,96 @@
+"""Compact record types for the typed mode (BittrexSocket(typed=True), BittrexAPI(typed=True)).
+
+Records keep fields in __slots__ instead of a per item dict, field names are the same for socket
+and REST payloads (a fill rate is `rate` for market history, exchange state and exchange deltas).
+Fields are readable as attributes and by name like a dict (level.rate, level['rate'], level.get('rate')),
+so code written for the translated dicts keeps working, dict(record) makes a plain dict.
+"""
+
+
+class Record:
+    """Base record, subclasses list the fields in __slots__, __init__ is generated with None defaults."""
+    __slots__ = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        fields = cls.__slots__
+        source = [f'def __init__(self, {", ".join(f"{f}=None" for f in fields)}):']
+        source.extend(f'    self.{f} = {f}' for f in fields)
+        namespace = {}
+        exec('\n'.join(source), namespace)
+        cls.__init__ = namespace['__init__']
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key) -> bool:
+        return key in self.__slots__
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self) -> int:
+        return len(self.__slots__)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.__slots__ else default
+
+    def keys(self):
+        return self.__slots__
+
+    def to_dict(self) -> dict:
+        return {f: getattr(self, f) for f in self.__slots__}
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in self.__slots__)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({", ".join(f"{f}={getattr(self, f)!r}" for f in self.__slots__)})'
+
+
+class BookLevel(Record):
+    """Order book level, type is set for deltas only (0 - add, 1 - remove, 2 - update)."""
+    __slots__ = ('rate', 'quantity', 'type')
+
+
+class Fill(Record):
+    """Market fill, total, fill_type and uuid are set for exchange state and market history fills."""
+    __slots__ = ('id', 'time_stamp', 'rate', 'quantity', 'order_type', 'total', 'fill_type', 'uuid')
+
+
+class SummaryDelta(Record):
+    """Market summary, uL deltas set market_name, last and base_volume only."""
+    __slots__ = (
+        'market_name', 'high', 'low', 'volume', 'last', 'base_volume', 'time_stamp', 'bid', 'ask',
+        'open_buy_orders', 'open_sell_orders', 'prev_day', 'created'
+    )
+
+
+class BalanceDelta(Record):
+    __slots__ = (
+        'uuid', 'account_id', 'currency', 'balance', 'available', 'pending', 'crypto_address', 'requested',
+        'updated', 'auto_sell'
+    )
+
+
+class OrderDelta(Record):
+    __slots__ = (
+        'uuid', 'id', 'order_uuid', 'exchange', 'order_type', 'quantity', 'quantity_remaining', 'limit',
+        'commission_paid', 'price', 'price_per_unit', 'opened', 'closed', 'is_open', 'cancel_initiated',
+        'immediate_or_cancel', 'is_conditional', 'condition', 'condition_target', 'updated', 'passthrough_uuid'
+    )
+
+
+class Candle(Record):
+    __slots__ = ('time_stamp', 'open', 'high', 'low', 'close', 'volume', 'base_volume')
+
+
+def to_record(cls, fields, d):
+    """Build a record from a payload dict, fields maps payload keys to record fields, unknown keys are dropped."""
+    if not isinstance(d, dict):
+        return d
+    return cls(**{fields[k]: v for k, v in d.items() if k in fields})
@@ -0,0 +1,240 @@
+import asyncio
+from bisect import insort
+from collections import deque
+from itertools import count
+from time import monotonic
+from typing import Dict, Optional, Tuple
+
+
+class RateWindow:
+    """Sliding window rate limit: at most rate_limit acquisitions per period seconds."""
+
+    def __init__(self, rate_limit: int, period: float):
+        self.rate_limit = rate_limit
+        self.period = period
+        self._times = deque()
+
+    def _purge(self, now: float):
+        times = self._times
+        while times and times[0] <= now - self.period:
+            times.popleft()
+
+    def available(self, now: float) -> bool:
+        self._purge(now)
+        return len(self._times) < self.rate_limit
+
+    def take(self, now: float):
+        self._times.append(now)
+
+    def next_free(self, now: float) -> float:
+        self._purge(now)
+        if len(self._times) < self.rate_limit:
+            return now
+        return self._times[0] + self.period
+
+
+class WaitStats:
+    """Queue wait time statistics, percentiles are computed over the last `size` waits."""
+
+    def __init__(self, size: int = 1000):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._recent = deque(maxlen=size)
+
+    def add(self, wait: float):
+        self.count += 1
+        self.total += wait
+        self.max = max(self.max, wait)
+        self._recent.append(wait)
+
+    def percentile(self, p: float) -> float:
+        if not self._recent:
+            return 0.0
+        recent = sorted(self._recent)
+        return recent[min(len(recent) - 1, int(len(recent) * p / 100))]
+
+    def to_dict(self) -> Dict:
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'p50': self.percentile(50),
+            'p99': self.percentile(99),
+            'max': self.max
+        }
+
+
+class RequestScheduler:
+    """Rate limiter with priority classes.
+
+    Every request takes a slot in the shared window, in the window of its API version (if configured)
+    and in the window of its priority class (if configured).
+    Waiting requests are granted slots in priority order (TRADE, ACCOUNT, PUBLIC), a request waiting
+    for a window blocks lower priority requests for that window only.
+
+    The shared rate limit adapts to the server responses: a throttling response halves it and pauses
+    all requests (for Retry-After seconds if provided), then the limit is increased by one request
+    every increase_interval seconds until the configured ceiling is reached.
+    """
+    TRADE = 0
+    ACCOUNT = 1
+    PUBLIC = 2
+    NAMES = {TRADE: 'trade', ACCOUNT: 'account', PUBLIC: 'public'}
+
+    def __init__(
+            self,
+            rate_limit: int = 60,
+            period: float = 60.0,
+            budgets: Optional[Dict[int, Tuple[int, float]]] = None,
+            versions: Optional[Dict[str, Tuple[int, float]]] = None,
+            min_rate_limit: int = 1,
+            decrease: float = 0.5,
+            increase_interval: float = 10.0,
+            clock=monotonic
+    ):
+        """
+        :param budgets: {priority: (rate_limit, period)}
+        :param versions: {version: (rate_limit, period)}
+        """
+        self._clock = clock
+        self._window = RateWindow(rate_limit, period)
+        self._budgets = {p: RateWindow(*b) for p, b in (budgets or {}).items()}
+        self._versions = {v: RateWindow(*b) for v, b in (versions or {}).items()}
+        self._waiters = []
+        self._seq = count()
+        self._timer = None
+        self.wait_stats = {p: WaitStats() for p in self.NAMES}
+        self.ceiling = rate_limit
+        self.min_rate_limit = min_rate_limit
+        self.decrease = decrease
+        self.increase_interval = increase_interval
+        self.throttles = 0
+        self._paused_until = 0.0
+        self._last_change = clock()
+
+    @property
+    def rate_limit(self) -> int:
+        return self._window.rate_limit
+
+    @property
+    def effective_rate(self) -> float:
+        """Current shared limit, requests per second."""
+        return self._window.rate_limit / self._window.period
+
+    def throttled(self, retry_after: float = None):
+        """Report a throttling response."""
+        now = self._clock()
+        self.throttles += 1
+        if now < self._paused_until:
+            return  # already reported
+        window = self._window
+        window.rate_limit = max(self.min_rate_limit, int(window.rate_limit * self.decrease))
+        self._paused_until = now + (retry_after if retry_after is not None else window.period / window.rate_limit)
+        self._last_change = now
+
+    def succeeded(self):
+        """Report a successful response."""
+        window = self._window
+        if window.rate_limit < self.ceiling:
+            now = self._clock()
+            if now - self._last_change >= self.increase_interval:
+                window.rate_limit += 1
+                self._last_change = now
+                if self._waiters:
+                    self._schedule()
+
+    def _windows(self, priority: int, version: str):
+        windows = [self._window]
+        if priority in self._budgets:
+            windows.append(self._budgets[priority])
+        if version in self._versions:
+            windows.append(self._versions[version])
+        return windows
+
+    async def acquire(self, priority: int = PUBLIC, version: str = 'v1.1'):
+        windows = self._windows(priority, version)
+        started = self._clock()
+
+        if not self._waiters and started >= self._paused_until and all(w.available(started) for w in windows):
+            for w in windows:
+                w.take(started)
+            self.wait_stats[priority].add(0.0)
+            return
+
+        future = asyncio.get_event_loop().create_future()
+        waiter = (priority, next(self._seq), windows, future)
+        insort(self._waiters, waiter)
+        self._schedule()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+                self._schedule()
+            raise
+        self.wait_stats[priority].add(self._clock() - started)
+
+    def _schedule(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        now = self._clock()
+        if now < self._paused_until:
+            if self._waiters:
+                self._timer = asyncio.get_event_loop().call_later(self._paused_until - now, self._schedule)
+            return
+
+        blocked = []
+        wake_at = None
+        for waiter in list(self._waiters):
+            priority, _, windows, future = waiter
+            if future.done():
+                self._waiters.remove(waiter)
+                continue
+            if any(w in blocked for w in windows):
+                continue
+            busy = [w for w in windows if not w.available(now)]
+            if busy:
+                blocked.extend(busy)
+                next_free = max(w.next_free(now) for w in busy)
+                wake_at = next_free if wake_at is None else min(wake_at, next_free)
+                continue
+            for w in windows:
+                w.take(now)
+            self._waiters.remove(waiter)
+            future.set_result(None)
+
+        if self._waiters and wake_at is not None:
+            self._timer = asyncio.get_event_loop().call_later(max(0.0, wake_at - now), self._schedule)
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def stats(self) -> Dict:
+        return {
+            'rate_limit': self.rate_limit,
+            'ceiling': self.ceiling,
+            'effective_rate': self.effective_rate,
+            'throttles': self.throttles,
+            'waiting': self.waiting,
+            'wait': {self.NAMES[p]: s.to_dict() for p, s in self.wait_stats.items()}
+        }
+
+
+class ThrottlerScheduler:
+    """asyncio_throttle.Throttler adapter, all requests share a single FIFO limit."""
+
+    def __init__(self, throttler):
+        self.throttler = throttler
+
+    async def acquire(self, priority: int = RequestScheduler.PUBLIC, version: str = 'v1.1'):
+        async with self.throttler:
+            pass
+
+    def throttled(self, retry_after: float = None):
+        pass
+
+    def succeeded(self):
+        pass
@@ -0,0 +1,30 @@
+import hashlib
+import hmac
+import threading
+from time import time
+
+
+class Signer:
+    """HMAC-SHA512 signatures and strictly increasing millisecond nonces.
+
+    The keyed HMAC state is computed once and copied for every message.
+    A nonce is max(last nonce + 1, current time in ms), so calls in the same millisecond
+    and clock steps backwards still get increasing nonces.
+    """
+
+    def __init__(self, secret: str, clock=time):
+        self._hmac = hmac.new(key=(secret or '').encode(), digestmod=hashlib.sha512)
+        self._clock = clock
+        self._last_nonce = 0
+        self._lock = threading.Lock()
+
+    def nonce(self) -> int:
+        now = int(self._clock() * 1000)
+        with self._lock:
+            nonce = self._last_nonce = max(self._last_nonce + 1, now)
+        return nonce
+
+    def sign(self, message: str) -> str:
+        signature = self._hmac.copy()
+        signature.update(message.encode())
+        return signature.hexdigest()
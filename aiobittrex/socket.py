@@ -1,16 +1,18 @@
 import asyncio
-import hashlib
-import hmac
 import json
 import logging
+import re
 import time
-from base64 import b64decode
 from urllib.parse import urlencode
-from zlib import decompress, MAX_WBITS
 
 import aiohttp
 
-from aiobittrex import BittrexSocketError, BittrexSocketConnectionClosed, BittrexSocketConnectionError
+from aiobittrex import BittrexSocketError
+from aiobittrex.book import OrderBookManager
+from aiobittrex.codec import Codec
+from aiobittrex.connection import SocketConnection, Subscription
+from aiobittrex.signing import Signer
+from aiobittrex.translate import KEYS, TRANSLATORS, TYPED_TRANSLATORS, replace_keys
 
 
 logger = logging.getLogger(__name__)
@@ -23,105 +25,44 @@ class BittrexSocket:
     SOCKET_URL = 'https://socket.bittrex.com/signalr/'
     SOCKET_HUB = 'c2'
 
-    KEYS = {
-        'A': 'ask',
-        'a': 'available',
-        'B': 'bid',
-        'b': 'balance',
-        'C': 'closed',
-        'c': 'currency',
-        'CI': 'cancel_initiated',
-        'D': 'deltas',
-        'd': 'delta',
-        'DT': 'order_delta_type',
-        'E': 'exchange',
-        'e': 'exchange_delta_type',
-        'F': 'fill_type',
-        'FI': 'fill_id',
-        'f': 'fills',
-        'G': 'open_buy_orders',
-        'g': 'open_sell_orders',
-        'H': 'high',
-        'h': 'auto_sell',
-        'I': 'id',
-        'i': 'is_open',
-        'J': 'condition',
-        'j': 'condition_target',
-        'K': 'immediate_or_cancel',
-        'k': 'is_conditional',
-        'L': 'low',
-        'l': 'last',
-        'M': 'market_name',
-        'm': 'base_volume',
-        'N': 'nonce',
-        'n': 'commission_paid',
-        'O': 'orders',
-        'o': 'order',
-        'OT': 'order_type',
-        'OU': 'order_uuid',
-        'P': 'price',
-        'p': 'crypto_address',
-        'PD': 'prev_day',
-        'PU': 'price_per_unit',
-        'Q': 'quantity',
-        'q': 'quantity_remaining',
-        'R': 'rate',
-        'r': 'requested',
-        'S': 'sells',
-        's': 'summaries',
-        'T': 'time_stamp',
-        't': 'total',
-        'TY': 'type',
-        'U': 'uuid',
-        'u': 'updated',
-        'V': 'volume',
-        'W': 'account_id',
-        'w': 'account_uuid',
-        'X': 'limit',
-        'x': 'created',
-        'Y': 'opened',
-        'y': 'state',
-        'Z': 'buys',
-        'z': 'pending'
-    }
-
-    def __init__(self, api_key=None, api_secret=None, loop=None):
+    KEYS = KEYS
+
+    def __init__(self, api_key=None, api_secret=None, loop=None, reconnect=False, codec=None, decode_executor=None,
+                 recorder=None, socket_url=None, metrics=None, typed=False):
+        """
+        :param typed: decode fills, book levels, summaries, balances and orders into aiobittrex.records types
+        """
         self.api_key = api_key
         self.api_secret = api_secret
+        self.reconnect = reconnect
+        self.codec = codec or Codec()
+        self.decode_executor = decode_executor
+        self.recorder = recorder
+        self.metrics = metrics
+        self.typed = typed
+        self._translators = TYPED_TRANSLATORS if typed else TRANSLATORS
+        self.socket_url = (socket_url or self.SOCKET_URL).rstrip('/') + '/'
         self._socket_url = None
+        self._connection = None
         self._loop = loop or asyncio.get_event_loop()
         self._session = aiohttp.ClientSession(loop=loop)
 
     async def close(self):
+        if self._connection is not None:
+            await self._connection.close()
         await self._session.close()
 
-    @staticmethod
-    def _decode(message):
-        try:
-            deflated_msg = decompress(b64decode(message, validate=True), -MAX_WBITS)
-        except SyntaxError:
-            deflated_msg = decompress(b64decode(message, validate=True))
-        return json.loads(deflated_msg.decode())
+    def _decode(self, message):
+        return self.codec.decode(message)
 
     @classmethod
     def replace_keys(cls, d):
-        if not isinstance(d, dict):
-            return d
-        result = {}
-        for key, value in d.items():
-            key = cls.KEYS.get(key, key)
-            if isinstance(value, dict):
-                result[key] = cls.replace_keys(value)
-            elif isinstance(value, list):
-                result[key] = [cls.replace_keys(v) for v in value]
-            else:
-                result[key] = value
-        return result
+        return replace_keys(d, cls.KEYS)
 
-    async def _get_socket_url(self):
-        if self._socket_url is None:
+    async def _get_socket_url(self, refresh=False):
+        if self._socket_url is None or refresh:
             conn_data = json.dumps([{'name': self.SOCKET_HUB}])
-            url = self.SOCKET_URL + 'negotiate' + '?' + urlencode({
+            url = self.socket_url + 'negotiate' + '?' + urlencode({
                 'clientProtocol': '1.5',
                 'connectionData': conn_data,
                 '_': round(time.time() * 1000)
@@ -130,7 +71,7 @@ class BittrexSocket:
             async with self._session.get(url) as r:
                 socket_conf = await r.json()
 
-            self._socket_url = self.SOCKET_URL.replace('https', 'wss') + 'connect' + '?' + urlencode({
+            self._socket_url = re.sub('^http', 'ws', self.socket_url) + 'connect' + '?' + urlencode({
                 'transport': 'webSockets',
                 'clientProtocol': socket_conf['ProtocolVersion'],
                 'connectionToken': socket_conf['ConnectionToken'],
@@ -140,43 +81,62 @@ class BittrexSocket:
 
         return self._socket_url
 
-    async def create_ws(self):
-        return await self._session.ws_connect(await self._get_socket_url())
-
-    async def _listen(self, endpoint, messages, ws=None):
-        ws = ws or await self.create_ws()
-
-        for n, m in enumerate(messages, start=1):
-            await ws.send_str(json.dumps({
-                'H': self.SOCKET_HUB,
-                'M': endpoint,
-                'A': m,
-                'I': n
-            }))
-
-        async for msg in ws:
-            if msg.type == aiohttp.WSMsgType.TEXT:
-                decoded_message = json.loads(msg.data)
-                if 'E' in decoded_message:
-                    raise BittrexSocketError(decoded_message['E'])
-                yield decoded_message
-            elif msg.type == aiohttp.WSMsgType.closed:
-                logger.warning('Websocket connection closed: %s', msg)
-                raise BittrexSocketConnectionClosed
-            elif msg.type == aiohttp.WSMsgType.error:
-                logger.error('Websocket connection error: %s', msg)
-                raise BittrexSocketConnectionError
-            else:
-                logger.warning("Message: {}".format(msg.type))
+    async def create_ws(self, refresh=False):
+        return await self._session.ws_connect(await self._get_socket_url(refresh=refresh))
+
+    def decode_message(self, callback, payload):
+        translate = self._translators.get(callback, self.replace_keys)
+        return translate(self._decode(payload))
+
+    @property
+    def connection(self) -> SocketConnection:
+        if self._connection is None:
+            self._connection = SocketConnection(
+                self,
+                reconnect=self.reconnect,
+                decode_executor=self.decode_executor,
+                recorder=self.recorder,
+                metrics=self.metrics
+            )
+        return self._connection
+
+    async def _authenticate(self, invoke=None):
+        invoke = invoke or self.connection.invoke
+        challenge = await invoke('GetAuthContext', self.api_key)
+        signature = Signer(self.api_secret).sign(challenge)
+        if not await invoke('Authenticate', self.api_key, signature):
+            raise BittrexSocketError('Authentication failed')
+
+    @staticmethod
+    def merge_deltas(old, new):
+        """Merge summary deltas messages keeping the latest delta for each market."""
+        deltas = {d['market_name']: d for d in old['deltas']}
+        for d in new['deltas']:
+            deltas[d['market_name']] = d
+        return dict(new, deltas=list(deltas.values()))
 
-    async def _get_auth_context(self, ws):
-        async for m in self._listen(endpoint='GetAuthContext', messages=[[self.api_key]], ws=ws):
-            if 'R' in m:
-                return m['R']
+    @staticmethod
+    def account_key(message):
+        if 'delta' in message:
+            return 'balance', message['delta']['currency']
+        return 'order', message['order']['order_uuid']
 
-    async def listen_account(self, ws=None):
+    async def _listen(self, callbacks, endpoint, messages, markets=None, **queue_options):
+        subscription = self.connection.subscribe(callbacks=callbacks, markets=markets, **queue_options)
+        try:
+            for m in messages:
+                subscription.invocations.append((endpoint, tuple(m)))
+                await self.connection.invoke(endpoint, *m)
+            async for m in subscription:
+                yield m
+        finally:
+            self.connection.unsubscribe(subscription)
+
+    async def listen_account(self, **queue_options):
         """Listen to account balance and orders updates
 
+        Messages are conflated by currency (balance) and order uuid (order) with the conflate policy.
+
         callbacks:
         uB - balance delta
         uO - order delta
@@ -226,21 +186,16 @@ class BittrexSocket:
             }
         }
         """
-        challenge = await self._get_auth_context(ws)
-        signature = hmac.new(
-            key=self.api_secret.encode(),
-            msg=challenge.encode(),
-            digestmod=hashlib.sha512
-        ).hexdigest()
-        async for m in self._listen(endpoint='Authenticate', messages=[[self.api_key, signature]], ws=ws):
-            if 'R' in m:
-                assert m['R']
-
-            for row in m.get('M') or []:
-                if row['M'] not in ('uB', 'uO'):
-                    continue
-                for a in row['A']:
-                    yield self.replace_keys(self._decode(a))
+        if queue_options.get('policy') == Subscription.CONFLATE:
+            queue_options.setdefault('key', self.account_key)
+        subscription = self.connection.subscribe(callbacks=('uB', 'uO'), **queue_options)
+        subscription.authenticated = True
+        try:
+            await self._authenticate()
+            async for m in subscription:
+                yield m
+        finally:
+            self.connection.unsubscribe(subscription)
 
     async def get_market(self, markets):
         """
@@ -268,19 +223,16 @@ class BittrexSocket:
             }
         }
         """
-        result = {}
-        async for m in self._listen(endpoint='QueryExchangeState', messages=[[m] for m in markets]):
-            if 'R' not in m:
-                continue
-            i = int(m['I'])
-            result[markets[i - 1]] = self.replace_keys(self._decode(m['R']))
-            if len(result) >= len(markets):
-                break
-        return result
-
-    async def listen_market(self, markets, ws=None):
+        results = await asyncio.gather(*(
+            self.connection.invoke('QueryExchangeState', market) for market in markets
+        ))
+        return {market: self.decode_message('QueryExchangeState', r) for market, r in zip(markets, results)}
+
+    async def listen_market(self, markets, **queue_options):
         """Listen to market updates
 
+        queue_options: maxsize, policy (block, drop_oldest, conflate), key, merge, see Subscription
+
         callbacks:
         - uE - market delta
 
@@ -301,12 +253,70 @@ class BittrexSocket:
             }]
         }
         """
-        async for m in self._listen(endpoint='SubscribeToExchangeDeltas', messages=[[m] for m in markets], ws=ws):
-            for row in m.get('M') or []:
-                if row['M'] != 'uE':
-                    continue
-                for a in row['A']:
-                    yield self.replace_keys(self._decode(a))
+        async for m in self._listen(
+                callbacks=('uE',),
+                endpoint='SubscribeToExchangeDeltas',
+                messages=[[m] for m in markets],
+                markets=markets,
+                **queue_options
+        ):
+            yield m
+
+    async def listen_books(self, markets, manager=None):
+        """Listen to local order books updates
+
+        Subscribes to market deltas first and then requests snapshots, deltas received
+        while a snapshot is in flight are buffered and replayed on top of it.
+        On a nonce gap only the affected market is re-requested.
+
+        Yields OrderBook instances after each change.
+        """
+        manager = manager or OrderBookManager()
+        subscription = self.connection.subscribe(callbacks=('uE',), markets=markets)
+        queries = set()
+
+        async def query(market):
+            manager.expect(market)
+            queries.add(market)
+            try:
+                state = await self.connection.invoke('QueryExchangeState', market)
+            except BittrexSocketError as e:
+                subscription.fail(e)
+            else:
+                subscription.put((market, self.decode_message('QueryExchangeState', state)))
+
+        def resync_all():
+            for market in markets:
+                if market not in queries:
+                    asyncio.ensure_future(query(market))
+
+        subscription.on_reconnect = resync_all
+
+        try:
+            for market in markets:
+                subscription.invocations.append(('SubscribeToExchangeDeltas', (market,)))
+                await self.connection.invoke('SubscribeToExchangeDeltas', market)
+            resync_all()
+
+            async for m in subscription:
+                if isinstance(m, tuple):
+                    market, state = m
+                    queries.discard(market)
+                    if state:
+                        yield manager.snapshot(market, state)
+                else:
+                    book = manager.apply(m)
+                    if book is not None:
+                        yield book
+
+                while manager.resync:
+                    market = manager.resync.pop()
+                    if market in queries:
+                        continue
+                    logger.warning('Nonce gap for %s, requesting a new snapshot.', market)
+                    asyncio.ensure_future(query(market))
+        finally:
+            self.connection.unsubscribe(subscription)
 
     async def get_summary(self):
         """
@@ -329,12 +339,12 @@ class BittrexSocket:
             }]
         }
         """
-        async for m in self._listen(endpoint='QuerySummaryState', messages=['']):
-            if 'R' in m:
-                return self.replace_keys(self._decode(m['R']))
+        return self.decode_message('QuerySummaryState', await self.connection.invoke('QuerySummaryState'))
 
-    async def listen_summary_light(self, ws=None):
+    async def listen_summary_light(self, **queue_options):
         """
+        Deltas are conflated by market name with the conflate policy.
+
         callbacks:
         - uL - light summary delta
 
@@ -346,15 +356,21 @@ class BittrexSocket:
             }]
         }
         """
-        async for m in self._listen(endpoint='SubscribeToSummaryLiteDeltas', messages=[''], ws=ws):
-            for row in m.get('M') or []:
-                if row['M'] != 'uL':
-                    continue
-                for a in row['A']:
-                    yield self.replace_keys(self._decode(a))
-
-    async def listen_summary(self, ws=None):
+        if queue_options.get('policy') == Subscription.CONFLATE:
+            queue_options.setdefault('key', lambda m: 'deltas')
+            queue_options.setdefault('merge', self.merge_deltas)
+        async for m in self._listen(
+                callbacks=('uL',),
+                endpoint='SubscribeToSummaryLiteDeltas',
+                messages=[[]],
+                **queue_options
+        ):
+            yield m
+
+    async def listen_summary(self, **queue_options):
         """
+        Deltas are conflated by market name with the conflate policy.
+
         callbacks:
         - uS - summary delta
 
@@ -377,9 +393,13 @@ class BittrexSocket:
             }]
         }
         """
-        async for m in self._listen(endpoint='SubscribeToSummaryDeltas', messages=[''], ws=ws):
-            for row in m.get('M') or []:
-                if row['M'] != 'uS':
-                    continue
-                for a in row['A']:
-                    yield self.replace_keys(self._decode(a))
+        if queue_options.get('policy') == Subscription.CONFLATE:
+            queue_options.setdefault('key', lambda m: 'deltas')
+            queue_options.setdefault('merge', self.merge_deltas)
+        async for m in self._listen(
+                callbacks=('uS',),
+                endpoint='SubscribeToSummaryDeltas',
+                messages=[[]],
+                **queue_options
+        ):
+            yield m
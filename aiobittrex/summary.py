@@ -0,0 +1,104 @@
+import asyncio
+import logging
+from typing import Dict, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+class SummaryCache:
+    """Markets summaries kept up to date from the socket.
+
+    Seeded from BittrexSocket.get_summary (QuerySummaryState) and updated with
+    listen_summary (uS) or listen_summary_light (uL) deltas merged by market name.
+    Every change increments the cache version, a market remembers the version it was changed in.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._summaries = {}
+        self._versions = {}
+        self._nonces = {}
+        self._waiter = None
+
+    def __contains__(self, market) -> bool:
+        return market in self._summaries
+
+    def __getitem__(self, market) -> Dict:
+        return self._summaries[market]
+
+    def __len__(self) -> int:
+        return len(self._summaries)
+
+    def __iter__(self):
+        return iter(self._summaries)
+
+    def get(self, market) -> Optional[Dict]:
+        return self._summaries.get(market)
+
+    def load(self, state: Dict):
+        """Load QuerySummaryState result, markets updated by newer deltas are kept."""
+        nonce = state.get('nonce')
+        self._update(state.get('summaries') or (), nonce)
+
+    def apply(self, delta: Dict) -> bool:
+        """Apply uS/uL delta, returns False if nothing was changed."""
+        return self._update(delta.get('deltas') or (), delta.get('nonce'))
+
+    def _update(self, summaries, nonce) -> bool:
+        changed = False
+        version = self.version + 1
+        for summary in summaries:
+            market = summary['market_name']
+            if nonce is not None:
+                if self._nonces.get(market, -1) > nonce:
+                    continue
+                self._nonces[market] = nonce
+            current = self._summaries.get(market)
+            if current is None:
+                self._summaries[market] = dict(summary)
+            else:
+                current.update(summary)
+            self._versions[market] = version
+            changed = True
+
+        if changed:
+            self.version = version
+            if self._waiter is not None and not self._waiter.done():
+                self._waiter.set_result(None)
+        return changed
+
+    def changed_since(self, version: int) -> Dict[str, Dict]:
+        return {
+            market: self._summaries[market]
+            for market, market_version in self._versions.items()
+            if market_version > version
+        }
+
+    async def wait_changed(self, version: int, timeout: float = None) -> Tuple[int, Dict[str, Dict]]:
+        """Wait for changes after the version, returns the current version and the changed markets."""
+        while self.version <= version:
+            if self._waiter is None or self._waiter.done():
+                self._waiter = asyncio.get_event_loop().create_future()
+            await asyncio.wait_for(asyncio.shield(self._waiter), timeout)
+        return self.version, self.changed_since(version)
+
+    async def run(self, socket, light: bool = False, **queue_options):
+        """Seed the cache and keep it up to date, runs until the socket subscription is closed."""
+        listen = socket.listen_summary_light if light else socket.listen_summary
+        deltas = listen(**queue_options)
+        seed = asyncio.ensure_future(socket.get_summary())
+        seed.add_done_callback(self._on_seed)
+        try:
+            async for delta in deltas:
+                self.apply(delta)
+        finally:
+            seed.cancel()
+
+    def _on_seed(self, future):
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            logger.error('Summaries seed failed: %s', future.exception())
+            return
+        self.load(future.result())
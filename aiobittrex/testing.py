@@ -0,0 +1,567 @@
+"""Local stand-in for the Bittrex REST API and the socket hub, for offline tests and load benchmarks.
+
+    async with FakeExchange(rates={'uE': 1000}) as exchange:
+        api = BittrexAPI(api_url=exchange.api_url)
+        socket = BittrexSocket(socket_url=exchange.socket_url)
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import random
+import zlib
+from base64 import b64encode
+from datetime import datetime, timezone
+from time import monotonic, time
+from uuid import uuid4
+
+from aiohttp import web, WSMsgType
+
+
+MARKETS = {
+    'BTC-ETH': 0.07,
+    'BTC-LTC': 0.017,
+    'BTC-TRX': 8.7e-06
+}
+
+RATES = {
+    'uE': 10.0,  # per market
+    'uS': 1.0,
+    'uL': 1.0,
+    'uB': 0.1,
+    'uO': 0.1
+}
+
+
+def encode(data) -> str:
+    """Socket payload: raw deflate, base64."""
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    return b64encode(compressor.compress(json.dumps(data).encode()) + compressor.flush()).decode()
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3]
+
+
+class FakeMarket:
+    """Random walk order book, produces exchange states, deltas and summaries in the socket format."""
+
+    def __init__(self, name: str, rate: float, rnd: random.Random, levels: int = 50):
+        self.name = name
+        self.rate = rate
+        self.last = rate
+        self.nonce = 0
+        self.volume = 0.0
+        self.fill_id = 0
+        self.fills = []
+        self._rnd = rnd
+        step = rate * 0.0005
+        self.buys = {round(rate - step * (n + 1), 10): self._quantity() for n in range(levels)}
+        self.sells = {round(rate + step * (n + 1), 10): self._quantity() for n in range(levels)}
+
+    def _quantity(self) -> float:
+        return round(self._rnd.uniform(0.1, 100.0) / self.rate * 0.01, 8)
+
+    def state(self):
+        return {
+            'M': None,
+            'N': self.nonce,
+            'Z': [{'Q': q, 'R': r} for r, q in sorted(self.buys.items(), reverse=True)],
+            'S': [{'Q': q, 'R': r} for r, q in sorted(self.sells.items())],
+            'f': [
+                {'I': f['FI'], 'T': f['T'], 'Q': f['Q'], 'P': f['R'], 't': f['Q'] * f['R'],
+                 'F': 'FILL', 'OT': f['OT'], 'U': str(uuid4())}
+                for f in self.fills[-20:]
+            ]
+        }
+
+    def delta(self):
+        """Change a random level, sometimes with a fill."""
+        rnd = self._rnd
+        self.nonce += 1
+        buy = rnd.random() < 0.5
+        side = self.buys if buy else self.sells
+        rates = sorted(side, reverse=buy)
+        changes = []
+        if rnd.random() < 0.3 and len(rates) > 1:
+            rate = rates[rnd.randrange(len(rates))]
+            del side[rate]
+            changes.append({'TY': 1, 'R': rate, 'Q': 0.0})
+        else:
+            rate = rates[rnd.randrange(len(rates))] if rates else self.rate
+            quantity = self._quantity()
+            changes.append({'TY': 2 if rate in side else 0, 'R': rate, 'Q': quantity})
+            side[rate] = quantity
+
+        fills = []
+        if rnd.random() < 0.2:
+            fill_side = self.sells if buy else self.buys
+            if fill_side:
+                rate = min(fill_side) if buy else max(fill_side)
+                self.fill_id += 1
+                fill = {
+                    'FI': self.fill_id,
+                    'OT': 'BUY' if buy else 'SELL',
+                    'R': rate,
+                    'Q': round(fill_side[rate] * rnd.uniform(0.1, 1.0), 8),
+                    'T': int(time() * 1000)
+                }
+                fills.append(fill)
+                self.fills = self.fills[-99:] + [fill]
+                self.last = rate
+                self.volume += fill['Q']
+
+        return {
+            'M': self.name,
+            'N': self.nonce,
+            'Z': changes if buy else [],
+            'S': [] if buy else changes,
+            'f': fills
+        }
+
+    def summary(self):
+        bid = max(self.buys) if self.buys else 0.0
+        ask = min(self.sells) if self.sells else 0.0
+        return {
+            'M': self.name,
+            'H': max(self.rate, self.last),
+            'L': min(self.rate, self.last),
+            'V': self.volume,
+            'l': self.last,
+            'm': self.volume * self.last,
+            'T': int(time() * 1000),
+            'B': bid,
+            'A': ask,
+            'G': len(self.buys),
+            'g': len(self.sells),
+            'PD': self.rate,
+            'x': 1392249600000
+        }
+
+    def rest_summary(self):
+        s = self.summary()
+        return {
+            'MarketName': self.name,
+            'High': s['H'],
+            'Low': s['L'],
+            'Volume': s['V'],
+            'Last': s['l'],
+            'BaseVolume': s['m'],
+            'TimeStamp': _iso(time()),
+            'Bid': s['B'],
+            'Ask': s['A'],
+            'OpenBuyOrders': s['G'],
+            'OpenSellOrders': s['g'],
+            'PrevDay': s['PD'],
+            'Created': '2014-02-13T00:00:00'
+        }
+
+
+class FakeConnection:
+    """Socket hub session: invocations, subscribed streams and push credit per stream."""
+
+    def __init__(self, ws: web.WebSocketResponse):
+        self.ws = ws
+        self.challenge = None
+        self.authenticated = False
+        self.streams = {}  # (callback, market) -> credit
+
+    def subscribe(self, callback: str, market: str = None):
+        self.streams.setdefault((callback, market), 0.0)
+
+
+class FakeExchange:
+    """aiohttp application with the SignalR negotiate/connect endpoints, the c2 hub methods and the REST paths.
+
+    Subscribed connections get compressed uE/uS/uL pushes, authenticated connections get uB/uO pushes,
+    at `rates` messages per second (uE per market). Messages due in the same tick are sent in one frame.
+    Orders placed with buylimit/selllimit are kept in memory and pushed as uO (open, cancel) deltas.
+    """
+
+    def __init__(self, markets=None, rates=None, api_key='key', api_secret='secret', seed=None, tick=0.01):
+        self._rnd = random.Random(seed)
+        self.markets = {name: FakeMarket(name, rate, self._rnd) for name, rate in (markets or MARKETS).items()}
+        self.rates = dict(RATES, **(rates or {}))
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.tick = tick
+        self.host = None
+        self.port = None
+        self.requests = []
+        self.invocations = []
+        self.orders = {}
+        self.balances = {'BTC': 1.0}
+        self.pushed = 0
+        self._nonce = 0
+        self._rest_nonces = set()
+        self._connections = set()
+        self._runner = None
+        self._pusher = None
+        self.app = web.Application()
+        self.app.router.add_get('/signalr/negotiate', self._negotiate)
+        self.app.router.add_get('/signalr/connect', self._connect)
+        self.app.router.add_get('/api/{version}/{path:.+}', self._rest)
+
+    @property
+    def api_url(self) -> str:
+        return f'http://{self.host}:{self.port}/api'
+
+    @property
+    def socket_url(self) -> str:
+        return f'http://{self.host}:{self.port}/signalr/'
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0):
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        self.host, self.port = self._runner.addresses[0][:2]
+        self._pusher = asyncio.ensure_future(self._push())
+
+    async def close(self):
+        if self._pusher is not None:
+            self._pusher.cancel()
+            self._pusher = None
+        for connection in list(self._connections):
+            await connection.ws.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def next_nonce(self) -> int:
+        self._nonce += 1
+        return self._nonce
+
+    # socket
+
+    async def _negotiate(self, request):
+        return web.json_response({
+            'Url': '/signalr',
+            'ConnectionToken': str(uuid4()),
+            'ConnectionId': str(uuid4()),
+            'KeepAliveTimeout': 20.0,
+            'DisconnectTimeout': 30.0,
+            'ConnectionTimeout': 110.0,
+            'TryWebSockets': True,
+            'ProtocolVersion': request.query.get('clientProtocol', '1.5'),
+            'TransportConnectTimeout': 5.0,
+            'LongPollDelay': 0.0
+        })
+
+    async def _connect(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        connection = FakeConnection(ws)
+        self._connections.add(connection)
+        try:
+            await ws.send_str(json.dumps({'C': 'd-0', 'S': 1, 'M': []}))
+            async for msg in ws:
+                if msg.type == WSMsgType.TEXT:
+                    await self._invoke(connection, json.loads(msg.data))
+        finally:
+            self._connections.discard(connection)
+        return ws
+
+    async def _invoke(self, connection: FakeConnection, message):
+        method, args, invocation_id = message['M'], message.get('A') or [], message['I']
+        self.invocations.append((method, tuple(args)))
+        try:
+            result = self._hub_method(connection, method, args)
+        except (KeyError, ValueError) as e:
+            reply = {'E': f'{method} failed: {e}', 'I': str(invocation_id)}
+        else:
+            reply = {'R': result, 'I': str(invocation_id)}
+        await connection.ws.send_str(json.dumps(reply))
+
+    def _hub_method(self, connection: FakeConnection, method: str, args):
+        if method == 'GetAuthContext':
+            if args[0] != self.api_key:
+                raise ValueError('unknown api key')
+            connection.challenge = str(uuid4())
+            return connection.challenge
+        if method == 'Authenticate':
+            signature = hmac.new(self.api_secret.encode(), connection.challenge.encode(), hashlib.sha512).hexdigest()
+            connection.authenticated = args[0] == self.api_key and hmac.compare_digest(signature, args[1])
+            if connection.authenticated:
+                connection.subscribe('uB')
+                connection.subscribe('uO')
+            return connection.authenticated
+        if method == 'QueryExchangeState':
+            return encode(self.markets[args[0]].state())
+        if method == 'QuerySummaryState':
+            return encode({'N': self.next_nonce(), 's': [m.summary() for m in self.markets.values()]})
+        if method == 'SubscribeToExchangeDeltas':
+            if args[0] not in self.markets:
+                raise KeyError(args[0])
+            connection.subscribe('uE', args[0])
+            return True
+        if method == 'SubscribeToSummaryDeltas':
+            connection.subscribe('uS')
+            return True
+        if method == 'SubscribeToSummaryLiteDeltas':
+            connection.subscribe('uL')
+            return True
+        raise ValueError('unknown method')
+
+    def _message(self, callback: str, market: str = None):
+        if callback == 'uE':
+            return self.markets[market].delta()
+        if callback == 'uS':
+            return {'N': self.next_nonce(), 'D': [m.summary() for m in self.markets.values()]}
+        if callback == 'uL':
+            return {'D': [{'M': m.name, 'l': m.last, 'm': m.volume * m.last} for m in self.markets.values()]}
+        if callback == 'uB':
+            currency = self._rnd.choice(sorted(self.balances))
+            return self._balance_delta(currency)
+        if callback == 'uO':
+            return self._order_delta(self._random_order(), 1)
+
+    async def _push(self):
+        last = monotonic()
+        while True:
+            await asyncio.sleep(self.tick)
+            now = monotonic()
+            elapsed, last = now - last, now
+            for connection in list(self._connections):
+                rows = []
+                for stream, credit in connection.streams.items():
+                    credit += self.rates.get(stream[0], 0.0) * elapsed
+                    while credit >= 1.0:
+                        credit -= 1.0
+                        rows.append({'H': 'C2', 'M': stream[0], 'A': [encode(self._message(*stream))]})
+                    connection.streams[stream] = credit
+                if rows and not connection.ws.closed:
+                    self.pushed += len(rows)
+                    await connection.ws.send_str(json.dumps({'C': f'd-{self._nonce}', 'M': rows}))
+
+    async def push(self, callback: str, message, authenticated: bool = False):
+        """Send a message (in the socket format) to the connections subscribed to the callback."""
+        row = {'H': 'C2', 'M': callback, 'A': [encode(message)]}
+        for connection in list(self._connections):
+            if authenticated and not connection.authenticated:
+                continue
+            if any(c == callback for c, _ in connection.streams) and not connection.ws.closed:
+                self.pushed += 1
+                await connection.ws.send_str(json.dumps({'C': f'd-{self._nonce}', 'M': [row]}))
+
+    def _balance_delta(self, currency: str):
+        balance = self.balances.get(currency, 0.0)
+        return {'N': self.next_nonce(), 'd': {
+            'U': str(uuid4()), 'W': 1, 'c': currency, 'b': balance, 'a': balance,
+            'z': 0.0, 'p': None, 'r': False, 'u': int(time() * 1000), 'h': None
+        }}
+
+    def _random_order(self):
+        if self.orders:
+            return self._rnd.choice(list(self.orders.values()))
+        market = self._rnd.choice(sorted(self.markets))
+        return self._new_order(market, 'LIMIT_BUY', 1.0, self.markets[market].rate)
+
+    def _new_order(self, market: str, order_type: str, quantity: float, rate: float):
+        now = int(time() * 1000)
+        return {
+            'OrderUuid': str(uuid4()),
+            'Exchange': market,
+            'Type': order_type,
+            'Quantity': quantity,
+            'QuantityRemaining': quantity,
+            'Limit': rate,
+            'Opened': now,
+            'Closed': None,
+            'IsOpen': True,
+            'CancelInitiated': False
+        }
+
+    def _order_delta(self, order, delta_type: int):
+        return {'w': 'account', 'N': self.next_nonce(), 'TY': delta_type, 'o': {
+            'U': str(uuid4()), 'I': 1, 'OU': order['OrderUuid'], 'E': order['Exchange'], 'OT': order['Type'],
+            'Q': order['Quantity'], 'q': order['QuantityRemaining'], 'X': order['Limit'], 'n': 0.0,
+            'P': 0.0, 'PU': 0.0, 'Y': order['Opened'], 'C': order['Closed'], 'i': order['IsOpen'],
+            'CI': order['CancelInitiated'], 'K': False, 'k': False, 'J': None, 'j': None,
+            'u': int(time() * 1000), 'PassthroughUuid': None
+        }}
+
+    def _rest_order(self, order):
+        return dict(
+            order,
+            Opened=_iso(order['Opened'] / 1000),
+            Closed=order['Closed'] and _iso(order['Closed'] / 1000),
+            OrderType=order['Type'],
+            CommissionPaid=0.0,
+            Price=0.0,
+            PricePerUnit=None,
+            ImmediateOrCancel=False,
+            IsConditional=False,
+            Condition='NONE',
+            ConditionTarget=None
+        )
+
+    # REST
+
+    async def _rest(self, request):
+        version, path = request.match_info['version'], request.match_info['path']
+        query = request.query
+        self.requests.append(f'{version}/{path}')
+
+        if path.startswith(('market/', 'account/', 'key/')):
+            signature = hmac.new(self.api_secret.encode(), str(request.url).encode(), hashlib.sha512).hexdigest()
+            if query.get('apikey') != self.api_key:
+                return self._error('APIKEY_INVALID')
+            if not hmac.compare_digest(signature, request.headers.get('apisign', '')):
+                return self._error('INVALID_SIGNATURE')
+            if query.get('nonce') in self._rest_nonces:
+                return self._error('NONCE_USED')
+            self._rest_nonces.add(query.get('nonce'))
+
+        handler = getattr(self, '_rest_' + path.replace('/', '_').lower(), None)
+        if handler is None:
+            return web.json_response({'success': False, 'message': 'NOT_FOUND', 'result': None}, status=404)
+        try:
+            result = await handler(query)
+        except KeyError as e:
+            return self._error(f'INVALID_PARAMETER: {e}')
+        return web.json_response({'success': True, 'message': '', 'result': result})
+
+    @staticmethod
+    def _error(message: str):
+        return web.json_response({'success': False, 'message': message, 'result': None})
+
+    async def _rest_public_getmarkets(self, query):
+        return [{
+            'MarketCurrency': name.split('-')[1],
+            'BaseCurrency': name.split('-')[0],
+            'MarketCurrencyLong': name.split('-')[1],
+            'BaseCurrencyLong': name.split('-')[0],
+            'MinTradeSize': 0.001,
+            'MarketName': name,
+            'IsActive': True,
+            'Created': '2014-02-13T00:00:00',
+            'Notice': None,
+            'IsSponsored': None,
+            'LogoUrl': None
+        } for name in self.markets]
+
+    async def _rest_public_getcurrencies(self, query):
+        currencies = sorted({c for name in self.markets for c in name.split('-')})
+        return [{
+            'Currency': c,
+            'CurrencyLong': c,
+            'MinConfirmation': 2,
+            'TxFee': 0.0005,
+            'IsActive': True,
+            'CoinType': 'BITCOIN',
+            'BaseAddress': None,
+            'Notice': None
+        } for c in currencies]
+
+    async def _rest_public_getticker(self, query):
+        summary = self.markets[query['market']].rest_summary()
+        return {'Bid': summary['Bid'], 'Ask': summary['Ask'], 'Last': summary['Last']}
+
+    async def _rest_public_getmarketsummaries(self, query):
+        return [m.rest_summary() for m in self.markets.values()]
+
+    async def _rest_public_getmarketsummary(self, query):
+        return [self.markets[query['market']].rest_summary()]
+
+    async def _rest_public_getorderbook(self, query):
+        market = self.markets[query['market']]
+        buy = [{'Quantity': q, 'Rate': r} for r, q in sorted(market.buys.items(), reverse=True)]
+        sell = [{'Quantity': q, 'Rate': r} for r, q in sorted(market.sells.items())]
+        order_type = query.get('type', 'both')
+        if order_type == 'buy':
+            return buy
+        if order_type == 'sell':
+            return sell
+        return {'buy': buy, 'sell': sell}
+
+    async def _rest_public_getmarkethistory(self, query):
+        market = self.markets[query['market']]
+        return [{
+            'Id': f['FI'],
+            'TimeStamp': _iso(f['T'] / 1000),
+            'Quantity': f['Q'],
+            'Price': f['R'],
+            'Total': f['Q'] * f['R'],
+            'FillType': 'FILL',
+            'OrderType': f['OT']
+        } for f in reversed(market.fills)]
+
+    async def _rest_pub_market_getticks(self, query):
+        market = self.markets[query['marketName']]
+        seconds = {'oneMin': 60, 'fiveMin': 300, 'thirtyMin': 1800, 'hour': 3600, 'day': 86400}[query['tickInterval']]
+        now = int(time()) // seconds * seconds
+        rate = market.rate
+        candles = []
+        for n in range(100, 0, -1):
+            close = rate * (1 + self._rnd.uniform(-0.002, 0.002))
+            candles.append({
+                'O': rate, 'H': max(rate, close), 'L': min(rate, close), 'C': close, 'V': 10.0,
+                'T': _iso(now - (n - 1) * seconds)[:19], 'BV': 10.0 * close
+            })
+            rate = close
+        return candles
+
+    async def _rest_pub_market_getlatesttick(self, query):
+        return (await self._rest_pub_market_getticks(query))[-1:]
+
+    async def _rest_pub_currencies_getwallethealth(self, query):
+        return [{'Health': {'Currency': c['Currency'], 'IsActive': True}, 'Currency': c}
+                for c in await self._rest_public_getcurrencies(query)]
+
+    async def _place(self, query, order_type):
+        market = query['market']
+        if market not in self.markets:
+            raise KeyError('market')
+        order = self._new_order(market, order_type, float(query['quantity']), float(query['rate']))
+        self.orders[order['OrderUuid']] = order
+        await self.push('uO', self._order_delta(order, 0), authenticated=True)
+        return {'uuid': order['OrderUuid']}
+
+    async def _rest_market_buylimit(self, query):
+        return await self._place(query, 'LIMIT_BUY')
+
+    async def _rest_market_selllimit(self, query):
+        return await self._place(query, 'LIMIT_SELL')
+
+    async def _rest_market_cancel(self, query):
+        order = self.orders[query['uuid']]
+        if order['IsOpen']:
+            order.update(IsOpen=False, CancelInitiated=True, Closed=int(time() * 1000))
+            await self.push('uO', self._order_delta(order, 3), authenticated=True)
+        return None
+
+    async def _rest_market_getopenorders(self, query):
+        market = query.get('market')
+        return [
+            self._rest_order(o) for o in self.orders.values()
+            if o['IsOpen'] and (market is None or o['Exchange'] == market)
+        ]
+
+    async def _rest_account_getorder(self, query):
+        return self._rest_order(self.orders[query['uuid']])
+
+    async def _rest_account_getorderhistory(self, query):
+        market = query.get('market')
+        return [
+            self._rest_order(o) for o in self.orders.values()
+            if not o['IsOpen'] and (market is None or o['Exchange'] == market)
+        ]
+
+    async def _rest_account_getbalances(self, query):
+        return [
+            {'Currency': c, 'Balance': b, 'Available': b, 'Pending': 0.0, 'CryptoAddress': None}
+            for c, b in sorted(self.balances.items())
+        ]
+
+    async def _rest_account_getbalance(self, query):
+        balance = self.balances.get(query['currency'], 0.0)
+        return {'Currency': query['currency'], 'Balance': balance, 'Available': balance,
+                'Pending': 0.0, 'CryptoAddress': None}
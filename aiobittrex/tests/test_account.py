@@ -0,0 +1,81 @@
+import asyncio
+from unittest import TestCase
+
+from aiobittrex.account import AccountState
+
+
+def balance_delta(nonce, currency, available):
+    return {'nonce': nonce, 'delta': {'currency': currency, 'balance': available, 'available': available}}
+
+
+def order_delta(nonce, delta_type, order_uuid, remaining, market='BTC-ETH'):
+    return {'nonce': nonce, 'type': delta_type, 'order': {
+        'order_uuid': order_uuid, 'exchange': market, 'quantity': 1.0, 'quantity_remaining': remaining,
+        'is_open': delta_type < AccountState.FILL
+    }}
+
+
+def rest_order(order_uuid, remaining, market='BTC-ETH'):
+    return {'OrderUuid': order_uuid, 'Exchange': market, 'Quantity': 1.0, 'QuantityRemaining': remaining}
+
+
+class FakeAPI:
+
+    def __init__(self, state):
+        self.state = state
+        self.balances = []
+        self.open_orders = []
+
+    async def get_balances(self):
+        # a delta received while the request is in flight
+        self.state.apply(balance_delta(10, 'ETH', 5.0))
+        return self.balances
+
+    async def get_open_orders(self):
+        return self.open_orders
+
+
+class AccountStateTestCase(TestCase):
+
+    def test_deltas(self):
+        state = AccountState()
+        state.apply(balance_delta(1, 'BTC', 1.0))
+        self.assertFalse(state.apply(balance_delta(1, 'BTC', 2.0)))
+        self.assertEqual(state.available('BTC'), 1.0)
+        self.assertEqual(state.available('LTC'), 0.0)
+
+        state.apply(order_delta(1, AccountState.OPEN, 'a', 1.0))
+        state.apply(order_delta(2, AccountState.OPEN, 'b', 1.0, market='BTC-TRX'))
+        state.apply(order_delta(3, AccountState.PARTIAL, 'a', 0.5))
+        self.assertEqual(state.order('a')['quantity_remaining'], 0.5)
+        self.assertEqual([o['order_uuid'] for o in state.open_orders('BTC-TRX')], ['b'])
+
+        state.apply(order_delta(4, AccountState.FILL, 'a', 0.0))
+        self.assertEqual([o['order_uuid'] for o in state.open_orders()], ['b'])
+
+    def test_reconcile(self):
+        loop = asyncio.new_event_loop()
+        state = AccountState()
+        api = FakeAPI(state)
+        api.balances = [
+            {'Currency': 'BTC', 'Balance': 1.0, 'Available': 0.8, 'Pending': 0.0},
+            {'Currency': 'ETH', 'Balance': 1.0, 'Available': 1.0, 'Pending': 0.0}
+        ]
+        api.open_orders = [rest_order('a', 1.0)]
+
+        loop.run_until_complete(state.reconcile(api))
+        self.assertTrue(state.seeded)
+        self.assertEqual(state.available('BTC'), 0.8)
+        self.assertEqual(state.available('ETH'), 5.0)  # the delta is newer
+        self.assertEqual(state.order('a')['exchange'], 'BTC-ETH')
+        self.assertEqual(state.drift, 0)
+
+        # missed: order a filled, order b opened, BTC balance changed
+        api.balances[0]['Available'] = 0.5
+        api.balances[1].update(Balance=5.0, Available=5.0)
+        api.open_orders = [rest_order('b', 1.0)]
+        loop.run_until_complete(state.reconcile(api))
+        self.assertEqual(state.available('BTC'), 0.5)
+        self.assertEqual([o['order_uuid'] for o in state.open_orders()], ['b'])
+        self.assertEqual(state.drift, 3)
+        loop.close()
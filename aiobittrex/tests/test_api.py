@@ -0,0 +1,144 @@
+import asyncio
+from unittest import TestCase
+
+from aiobittrex.api import BittrexAPI
+from aiobittrex.cache import TTLCache
+from aiobittrex.errors import BittrexResponseError, BittrexThrottledError
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class BittrexAPITestCase(TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.clock = FakeClock()
+        self.requests = []
+
+        async def fetch(url, headers, priority, version, sign=False):
+            self.requests.append(url)
+            result = [len(self.requests)]
+            await asyncio.sleep(0)
+            return result
+
+        async def create_api():
+            api = BittrexAPI(api_key='key', api_secret='secret', cache=TTLCache(stale_ttl=10, clock=self.clock))
+            api._fetch = fetch
+            return api
+
+        self.api = self.run_async(create_api())
+
+    def tearDown(self):
+        self.run_async(self.api.close(delay=0))
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def run_async(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    def test_cache(self):
+        self.assertEqual(self.run_async(self.api.get_markets()), [1])
+        self.assertEqual(self.run_async(self.api.get_markets()), [1])
+        self.assertEqual(len(self.requests), 1)
+
+        # stale, refreshed in background
+        self.clock.now = 65
+        self.assertEqual(self.run_async(self.api.get_markets()), [1])
+        self.run_async(asyncio.sleep(0.01))
+        self.assertEqual(len(self.requests), 2)
+        self.assertEqual(self.run_async(self.api.get_markets()), [2])
+
+        # expired
+        self.clock.now = 200
+        self.assertEqual(self.run_async(self.api.get_markets()), [3])
+
+    def test_authenticated_not_cached(self):
+        self.run_async(self.api._request(path='account/getbalances', authenticate=True, ttl=60))
+        self.run_async(self.api._request(path='account/getbalances', authenticate=True, ttl=60))
+        self.assertEqual(len(self.requests), 2)
+        self.assertEqual(len(self.api._cache), 0)
+
+    def test_lru(self):
+        cache = TTLCache(maxsize=2, clock=self.clock)
+        cache.set('a', 1, ttl=10)
+        cache.set('b', 2, ttl=10)
+        cache.lookup('a')
+        cache.set('c', 3, ttl=10)
+        self.assertEqual(cache.lookup('b'), (TTLCache.MISS, None))
+        self.assertEqual(cache.lookup('a'), (TTLCache.FRESH, 1))
+
+    def test_coalesce(self):
+        async def run():
+            return await asyncio.gather(
+                self.api.get_ticker('BTC-LTC'),
+                self.api.get_ticker('BTC-LTC'),
+                self.api.get_ticker('BTC-ETH'),
+                self.api.get_ticker('BTC-LTC')
+            )
+
+        self.assertEqual(self.run_async(run()), [[1], [1], [2], [1]])
+        self.assertEqual(len(self.requests), 2)
+        self.assertEqual(self.api.coalesced, 2)
+        self.assertEqual(self.api._in_flight, {})
+
+    def test_retry(self):
+        failures = [BittrexThrottledError(429, 'Too many requests', retry_after=0), BittrexResponseError(502, '')]
+
+        async def fetch(url, headers, priority, version, sign=False):
+            self.requests.append(url)
+            if failures:
+                raise failures.pop(0)
+            return {'Last': 0.017}
+
+        self.api._fetch = fetch
+        self.api.retry_backoff = 0.001
+        self.assertEqual(self.run_async(self.api.get_ticker('BTC-LTC')), {'Last': 0.017})
+        self.assertEqual(len(self.requests), 3)
+
+        failures.append(BittrexResponseError(400, ''))
+        with self.assertRaises(BittrexResponseError):
+            self.run_async(self.api.get_ticker('BTC-LTC'))
+
+    def test_throttled_response(self):
+        class Response:
+            status = 429
+            content_type = 'application/json'
+            headers = {'Retry-After': '3'}
+
+            async def text(self):
+                return ''
+
+        with self.assertRaises(BittrexThrottledError) as cm:
+            self.run_async(self.api._handle_response(Response()))
+        self.assertEqual(cm.exception.retry_after, 3.0)
+
+    def test_batched(self):
+        async def fetch(url, headers, priority, version, sign=False):
+            self.requests.append(url)
+            if 'getmarketsummaries' in url:
+                return [
+                    {'MarketName': 'BTC-LTC', 'Bid': 1, 'Ask': 2, 'Last': 1.5},
+                    {'MarketName': 'BTC-ETH', 'Bid': 3, 'Ask': 4, 'Last': 3.5},
+                    {'MarketName': 'BTC-TRX', 'Bid': 5, 'Ask': 6, 'Last': 5.5}
+                ]
+            return {'Bid': 1, 'Ask': 2, 'Last': 1.5}
+
+        self.api._fetch = fetch
+
+        tickers = self.run_async(self.api.get_tickers(['BTC-ETH', 'BTC-LTC', 'BTC-XXX']))
+        self.assertEqual(tickers, {
+            'BTC-ETH': {'Bid': 3, 'Ask': 4, 'Last': 3.5},
+            'BTC-LTC': {'Bid': 1, 'Ask': 2, 'Last': 1.5}
+        })
+        self.assertEqual(len(self.requests), 1)
+
+        self.assertEqual(self.run_async(self.api.get_tickers(['BTC-LTC'])), {'BTC-LTC': {'Bid': 1, 'Ask': 2, 'Last': 1.5}})
+        self.assertIn('getticker', self.requests[-1])
@@ -0,0 +1,78 @@
+from unittest import TestCase
+
+from aiobittrex.book import OrderBook, OrderBookManager
+
+
+class OrderBookTestCase(TestCase):
+
+    def setUp(self):
+        self.state = {
+            'market_name': None,
+            'nonce': 10,
+            'buys': [{'quantity': 1.0, 'rate': 8.64e-06}, {'quantity': 2.0, 'rate': 8.67e-06}],
+            'sells': [{'quantity': 3.0, 'rate': 8.7e-06}, {'quantity': 4.0, 'rate': 8.69e-06}]
+        }
+
+    def test_snapshot(self):
+        book = OrderBook.from_snapshot('BTC-TRX', self.state)
+
+        self.assertEqual(book.nonce, 10)
+        self.assertEqual(book.best_bid(), {'rate': 8.67e-06, 'quantity': 2.0})
+        self.assertEqual(book.best_ask(), {'rate': 8.69e-06, 'quantity': 4.0})
+        self.assertEqual([l['rate'] for l in book.buys.levels()], [8.67e-06, 8.64e-06])
+        self.assertEqual([l['rate'] for l in book.sells.levels(depth=1)], [8.69e-06])
+
+    def test_apply(self):
+        manager = OrderBookManager()
+        manager.snapshot('BTC-TRX', self.state)
+
+        book = manager.apply({
+            'market_name': 'BTC-TRX',
+            'nonce': 11,
+            'buys': [
+                {'type': 0, 'rate': 8.68e-06, 'quantity': 5.0},
+                {'type': 1, 'rate': 8.67e-06, 'quantity': 0.0}
+            ],
+            'sells': [{'type': 2, 'rate': 8.69e-06, 'quantity': 1.5}],
+            'fills': []
+        })
+
+        self.assertEqual(book.nonce, 11)
+        self.assertEqual(book.best_bid(), {'rate': 8.68e-06, 'quantity': 5.0})
+        self.assertEqual(len(book.buys), 2)
+        self.assertEqual(book.best_ask(), {'rate': 8.69e-06, 'quantity': 1.5})
+
+        # already applied
+        self.assertIsNone(manager.apply({'market_name': 'BTC-TRX', 'nonce': 11, 'buys': [], 'sells': []}))
+        # unknown market
+        self.assertIsNone(manager.apply({'market_name': 'BTC-ETH', 'nonce': 1, 'buys': [], 'sells': []}))
+
+    def test_buffer_and_resync(self):
+        manager = OrderBookManager()
+        manager.expect('BTC-TRX')
+
+        def delta(nonce, rate):
+            return {
+                'market_name': 'BTC-TRX',
+                'nonce': nonce,
+                'buys': [{'type': 0, 'rate': rate, 'quantity': 1.0}],
+                'sells': []
+            }
+
+        for nonce in (9, 10, 11, 12):
+            self.assertIsNone(manager.apply(delta(nonce, 8.6e-06 + nonce * 1e-08)))
+
+        book = manager.snapshot('BTC-TRX', self.state)
+        self.assertEqual(book.nonce, 12)
+        self.assertFalse(manager.is_pending('BTC-TRX'))
+
+        # gap: 13 is missing
+        self.assertIsNone(manager.apply(delta(14, 8.9e-06)))
+        self.assertEqual(manager.resync, {'BTC-TRX'})
+        self.assertTrue(manager.is_pending('BTC-TRX'))
+        self.assertIsNone(manager.apply(delta(15, 8.91e-06)))
+
+        book = manager.snapshot('BTC-TRX', dict(self.state, nonce=14))
+        self.assertEqual(book.nonce, 15)
+        self.assertEqual(manager.resync, set())
+        self.assertEqual(book.best_bid()['rate'], 8.91e-06)
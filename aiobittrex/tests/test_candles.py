@@ -0,0 +1,86 @@
+from unittest import TestCase, skipIf
+
+from aiobittrex.candles import CandleBuilder, Candles, np
+
+
+def candle(t, c):
+    return {'O': c, 'H': c, 'L': c, 'C': c, 'V': 1.0, 'T': t, 'BV': c}
+
+
+@skipIf(np is None, "numpy is not installed")
+class CandlesTestCase(TestCase):
+
+    def test_parse(self):
+        candles = Candles.from_records([
+            candle('2018-04-23T14:08:00', 2.0),
+            candle('2018-04-23T14:07:00', 1.0)
+        ])
+        self.assertEqual(len(candles), 2)
+        self.assertEqual(candles['T'][0], np.datetime64('2018-04-23T14:07:00'))
+        self.assertEqual(candles['C'].tolist(), [1.0, 2.0])
+        self.assertEqual(candles.to_list()[0], candle('2018-04-23T14:07:00', 1.0))
+
+    def test_merge(self):
+        candles = Candles.from_records([
+            candle('2018-04-23T14:07:00', 1.0),
+            candle('2018-04-23T14:08:00', 2.0),
+            candle('2018-04-23T14:09:00', 3.0)
+        ], maxlen=3)
+
+        # the latest candle updated
+        candles.merge(candle('2018-04-23T14:09:00', 3.5))
+        self.assertEqual(candles['C'].tolist(), [1.0, 2.0, 3.5])
+
+        # a new candle, the oldest one is dropped
+        candles.merge(candle('2018-04-23T14:10:00', 4.0))
+        self.assertEqual(candles['C'].tolist(), [2.0, 3.5, 4.0])
+
+        # overlapping candles replace the known ones
+        candles.merge([candle('2018-04-23T14:09:00', 3.0), candle('2018-04-23T14:10:00', 4.5)])
+        self.assertEqual(candles['C'].tolist(), [2.0, 3.0, 4.5])
+        self.assertEqual(candles['T'][-1], np.datetime64('2018-04-23T14:10:00'))
+
+
+class CandleBuilderTestCase(TestCase):
+
+    def test_aggregate(self):
+        builder = CandleBuilder(intervals=('oneMin', 'fiveMin'))
+        # 2018-04-23T14:07:00
+        start = 1524492420000
+
+        self.assertEqual(builder.apply({'market_name': 'BTC-ETH', 'nonce': 1, 'fills': [
+            {'order_type': 'BUY', 'rate': 2.0, 'quantity': 1.0, 'time_stamp': start + 1000},
+            {'order_type': 'SELL', 'rate': 1.0, 'quantity': 2.0, 'time_stamp': start + 2000},
+            {'order_type': 'BUY', 'rate': 3.0, 'quantity': 1.0, 'time_stamp': start + 3000}
+        ]}), [])
+        self.assertEqual(builder.current('BTC-ETH', 'oneMin'), {
+            'O': 2.0, 'H': 3.0, 'L': 1.0, 'C': 3.0, 'V': 4.0, 'T': '2018-04-23T14:07:00', 'BV': 7.0
+        })
+        self.assertEqual(builder.current('BTC-ETH', 'fiveMin')['T'], '2018-04-23T14:05:00')
+
+        # duplicated delta
+        self.assertEqual(builder.apply({'market_name': 'BTC-ETH', 'nonce': 1, 'fills': [
+            {'order_type': 'BUY', 'rate': 5.0, 'quantity': 1.0, 'time_stamp': start + 4000}
+        ]}), [])
+
+        closed = builder.add_fill('BTC-ETH', rate=4.0, quantity=1.0, time_stamp=start + 61000)
+        self.assertEqual([(m, i, c['C']) for m, i, c in closed], [('BTC-ETH', 'oneMin', 3.0)])
+        self.assertEqual(builder.current('BTC-ETH', 'fiveMin')['C'], 4.0)
+
+        closed = builder.flush(now=start / 1000 + 170)
+        self.assertEqual([(i, c['T']) for m, i, c in closed], [('oneMin', '2018-04-23T14:08:00')])
+        closed = builder.flush(now=start / 1000 + 170)
+        self.assertEqual(closed, [])
+        self.assertEqual(len(builder.get('BTC-ETH', 'oneMin')), 2)
+
+    def test_seed(self):
+        builder = CandleBuilder(intervals=('oneMin',))
+        builder.add_fill('BTC-ETH', rate=2.0, quantity=1.0, time_stamp=1524492420000)
+        builder.seed('BTC-ETH', 'oneMin', [
+            candle('2018-04-23T14:06:00', 1.0),
+            {'O': 1.5, 'H': 2.5, 'L': 1.5, 'C': 1.5, 'V': 0.5, 'T': '2018-04-23T14:07:00', 'BV': 0.75}
+        ])
+        self.assertEqual(builder.get('BTC-ETH', 'oneMin'), [
+            candle('2018-04-23T14:06:00', 1.0),
+            {'O': 1.5, 'H': 2.5, 'L': 1.5, 'C': 2.0, 'V': 1.0, 'T': '2018-04-23T14:07:00', 'BV': 2.0}
+        ])
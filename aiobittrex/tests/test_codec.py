@@ -0,0 +1,30 @@
+import json
+import zlib
+from base64 import b64encode
+from unittest import TestCase
+
+from aiobittrex.codec import Codec
+
+
+def encode(data, wbits):
+    compressor = zlib.compressobj(wbits=wbits)
+    return b64encode(compressor.compress(json.dumps(data).encode()) + compressor.flush()).decode()
+
+
+class CodecTestCase(TestCase):
+
+    def test_decode(self):
+        codec = Codec(backend='json')
+        data = {'M': 'BTC-ETH', 'N': 1}
+
+        self.assertEqual(codec.decode(encode(data, wbits=-zlib.MAX_WBITS)), data)
+        self.assertEqual(codec.decode(encode(data, wbits=zlib.MAX_WBITS)), data)
+        # zlib headers framing is tried first now
+        self.assertEqual(codec._wbits, zlib.MAX_WBITS)
+        self.assertEqual(codec.decode(encode(data, wbits=zlib.MAX_WBITS)), data)
+        self.assertEqual(codec.payloads, 3)
+
+    def test_backend(self):
+        self.assertEqual(Codec(backend='json').load_frame('{"C": "x"}'), {'C': 'x'})
+        with self.assertRaises(ValueError):
+            Codec(backend='unknown')
@@ -0,0 +1,192 @@
+import asyncio
+import json
+import zlib
+from base64 import b64encode
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from aiobittrex.codec import Codec
+from aiobittrex.connection import SocketConnection, Subscription
+from aiobittrex.socket import BittrexSocket
+
+
+class FakeWebSocket:
+    close_code = None
+
+    def __init__(self):
+        self.sent = []
+        self.closed = False
+        self._frames = asyncio.Queue()
+
+    async def send_str(self, data):
+        self.sent.append(json.loads(data))
+
+    async def close(self):
+        self.closed = True
+        self._frames.put_nowait(None)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        frame = await self._frames.get()
+        if frame is None:
+            raise StopAsyncIteration
+        return frame
+
+
+class FakeSocket:
+    SOCKET_HUB = 'c2'
+    typed = False
+
+    def __init__(self):
+        self.codec = Codec()
+        self.decoded = 0
+        self.websockets = []
+
+    async def create_ws(self, refresh=False):
+        self.websockets.append(FakeWebSocket())
+        return self.websockets[-1]
+
+    async def _authenticate(self, invoke=None):
+        pass
+
+    def decode_message(self, callback, payload):
+        self.decoded += 1
+        return payload
+
+
+class SocketConnectionTestCase(TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.socket = FakeSocket()
+        self.connection = SocketConnection(self.socket, reconnect=True)
+
+    def tearDown(self):
+        self.loop.run_until_complete(self.connection.close())
+        self.loop.close()
+
+    async def reply(self, ws, result, n=-1):
+        while len(ws.sent) < abs(n) + (0 if n < 0 else 1):
+            await asyncio.sleep(0)
+        self.connection._handle_frame(json.dumps({'R': result, 'I': str(ws.sent[n]['I'])}))
+
+    def test_invoke(self):
+        async def run():
+            first = asyncio.ensure_future(self.connection.invoke('QueryExchangeState', 'BTC-ETH'))
+            second = asyncio.ensure_future(self.connection.invoke('QueryExchangeState', 'BTC-TRX'))
+            ws = await self.connection.connect()
+            await self.reply(ws, 'trx', n=1)
+            await self.reply(ws, 'eth', n=0)
+
+            self.assertEqual([m['A'] for m in ws.sent], [['BTC-ETH'], ['BTC-TRX']])
+            self.assertNotEqual(ws.sent[0]['I'], ws.sent[1]['I'])
+            return await first, await second
+
+        self.assertEqual(self.loop.run_until_complete(run()), ('eth', 'trx'))
+
+    def test_dispatch(self):
+        market = self.connection.subscribe(callbacks=('uE',), markets=['BTC-ETH'])
+        summary = self.connection.subscribe(callbacks=('uS', 'uL'))
+
+        self.connection._handle_frame(json.dumps({'C': 'x', 'M': [
+            {'H': 'C2', 'M': 'uE', 'A': [{'market_name': 'BTC-ETH'}, {'market_name': 'BTC-TRX'}]},
+            {'H': 'C2', 'M': 'uL', 'A': [{'deltas': []}]},
+            {'H': 'C2', 'M': 'uB', 'A': [{'delta': {}}]}
+        ]}))
+
+        self.assertEqual(self.socket.decoded, 3)
+        self.assertEqual(market.get_nowait(), {'market_name': 'BTC-ETH'})
+        self.assertEqual(market.depth, 0)
+        self.assertEqual(summary.get_nowait(), {'deltas': []})
+
+        self.connection.unsubscribe(market)
+        self.assertNotIn('uE', self.connection._subscriptions)
+
+    def test_reconnect(self):
+        async def run():
+            subscription = self.connection.subscribe(callbacks=('uS',))
+            subscription.invocations.append(('SubscribeToSummaryDeltas', ()))
+            reconnected = []
+            subscription.on_reconnect = lambda: reconnected.append(True)
+
+            ws = await self.connection.connect()
+            await ws.close()
+
+            # replayed on the new connection
+            while len(self.socket.websockets) < 2:
+                await asyncio.sleep(0)
+            new_ws = self.socket.websockets[1]
+            await self.reply(new_ws, True, n=0)
+            self.assertEqual(await self.connection.connect(), new_ws)
+            self.assertEqual(new_ws.sent[0]['M'], 'SubscribeToSummaryDeltas')
+            self.assertEqual(self.connection.reconnects, 1)
+            self.assertEqual(reconnected, [True])
+
+            self.connection._handle_frame(json.dumps({'M': [{'M': 'uS', 'A': [{'nonce': 1}]}]}))
+            return await subscription.__anext__()
+
+        self.assertEqual(self.loop.run_until_complete(run()), {'nonce': 1})
+
+    def test_decode_executor(self):
+        payload = b64encode(zlib.compress(json.dumps({'M': 'BTC-ETH', 'N': 1}).encode())).decode()
+        self.socket.codec = Codec(backend='json')
+        self.connection.decode_executor = ThreadPoolExecutor(max_workers=2)
+        subscription = self.connection.subscribe(callbacks=('uE',))
+
+        async def run():
+            for _ in range(3):
+                self.connection._handle_frame(json.dumps({'M': [{'M': 'uE', 'A': [payload, payload]}]}))
+            return [await subscription.__anext__() for _ in range(6)]
+
+        messages = self.loop.run_until_complete(run())
+        self.connection.decode_executor.shutdown()
+
+        self.assertEqual(messages, [{'market_name': 'BTC-ETH', 'nonce': 1}] * 6)
+        self.assertEqual(self.socket.decoded, 0)
+
+
+class SubscriptionTestCase(TestCase):
+
+    def test_drop_oldest(self):
+        subscription = Subscription(callbacks=('uE',), maxsize=2, policy=Subscription.DROP_OLDEST)
+        for n in range(4):
+            self.assertTrue(subscription.put({'nonce': n}))
+
+        self.assertEqual(subscription.dropped, 2)
+        self.assertEqual(subscription.get_nowait(), {'nonce': 2})
+        self.assertEqual(subscription.depth, 1)
+
+    def test_conflate(self):
+        subscription = Subscription(
+            callbacks=('uS',),
+            maxsize=10,
+            policy=Subscription.CONFLATE,
+            key=lambda m: 'deltas',
+            merge=BittrexSocket.merge_deltas
+        )
+        subscription.put({'nonce': 1, 'deltas': [{'market_name': 'BTC-ETH', 'last': 1}]})
+        subscription.put({'nonce': 2, 'deltas': [{'market_name': 'BTC-TRX', 'last': 2}]})
+        subscription.put({'nonce': 3, 'deltas': [{'market_name': 'BTC-ETH', 'last': 3}]})
+
+        self.assertEqual(subscription.conflated, 2)
+        self.assertEqual(subscription.get_nowait(), {'nonce': 3, 'deltas': [
+            {'market_name': 'BTC-ETH', 'last': 3},
+            {'market_name': 'BTC-TRX', 'last': 2}
+        ]})
+
+    def test_block(self):
+        loop = asyncio.new_event_loop()
+        subscription = Subscription(callbacks=('uE',), maxsize=1)
+
+        async def run():
+            self.assertFalse(subscription.put({'nonce': 1}))
+            writer = asyncio.ensure_future(subscription.writable())
+            await asyncio.sleep(0)
+            self.assertFalse(writer.done())
+            self.assertEqual(await subscription.__anext__(), {'nonce': 1})
+            await asyncio.wait_for(writer, 1)
+
+        loop.run_until_complete(run())
+        loop.close()
@@ -0,0 +1,50 @@
+from math import isnan
+from unittest import TestCase, skipIf
+
+from aiobittrex.book import OrderBook
+from aiobittrex.depth import DepthBook, batch_query, np
+
+
+STATE = {
+    'market_name': None,
+    'nonce': 1,
+    'buys': [{'rate': 9.0, 'quantity': 1.0}, {'rate': 8.0, 'quantity': 2.0}, {'rate': 5.0, 'quantity': 10.0}],
+    'sells': [{'rate': 11.0, 'quantity': 1.0}, {'rate': 12.0, 'quantity': 2.0}, {'rate': 20.0, 'quantity': 10.0}]
+}
+
+
+@skipIf(np is None, "numpy is not installed")
+class DepthBookTestCase(TestCase):
+
+    def test_queries(self):
+        book = DepthBook.from_state(STATE, market='BTC-ETH')
+        self.assertEqual(book.spread(), 2.0)
+
+        self.assertEqual(book.sells.cost(2), 23.0)
+        self.assertEqual(book.sells.vwap(2), 11.5)
+        self.assertAlmostEqual(book.buys.vwap(3), 25.0 / 3)
+        self.assertAlmostEqual(book.buys.impact(3), (9.0 - 25.0 / 3) / 9.0)
+        self.assertTrue(isnan(book.sells.vwap(14)))
+
+        self.assertEqual(book.sells.depth(0.1), 3.0)
+        self.assertEqual(book.buys.depth(0.05), 1.0)
+        self.assertEqual(book.buys.depth(0.5), 13.0)
+
+        self.assertEqual(book.sells.vwap([1, 2, 13]).tolist(), [11.0, 11.5, 235.0 / 13])
+        self.assertEqual(book.sells.depth([0.0, 0.1, 1.0]).tolist(), [1.0, 3.0, 13.0])
+
+    def test_sources(self):
+        rest = DepthBook.from_order_book({
+            'buy': [{'Rate': r['rate'], 'Quantity': r['quantity']} for r in STATE['buys']],
+            'sell': [{'Rate': r['rate'], 'Quantity': r['quantity']} for r in STATE['sells']]
+        }, market='BTC-ETH')
+        local = DepthBook.from_book(OrderBook.from_snapshot('BTC-TRX', STATE))
+
+        result = batch_query([rest, local], 'buys', 'vwap', [1, 3])
+        self.assertEqual(list(result), ['BTC-ETH', 'BTC-TRX'])
+        self.assertEqual(result['BTC-ETH'].tolist(), result['BTC-TRX'].tolist())
+
+        empty = DepthBook.from_state({'buys': [], 'sells': []})
+        self.assertIsNone(empty.spread())
+        self.assertTrue(isnan(empty.sells.vwap(1)))
+        self.assertEqual(empty.sells.depth(0.1), 0.0)
@@ -0,0 +1,107 @@
+import asyncio
+import json
+import socket
+from time import time
+from unittest import TestCase, skipIf
+
+from aiobittrex.api import BittrexAPI
+from aiobittrex.connection import SocketConnection
+from aiobittrex.errors import BittrexApiError
+from aiobittrex.metrics import Metrics, PrometheusMetrics, StatsDMetrics, prometheus_client
+from aiobittrex.testing import FakeExchange
+from aiobittrex.tests.test_connection import FakeSocket
+
+
+class RecordingMetrics(Metrics):
+    enabled = True
+
+    def __init__(self):
+        self.calls = []
+
+    def increment(self, name, value=1, tags=None):
+        self.calls.append((name, value, tags))
+
+    def observe(self, name, value, tags=None):
+        self.calls.append((name, value, tags))
+
+    def names(self):
+        return [name for name, _, _ in self.calls]
+
+
+class MetricsTestCase(TestCase):
+
+    def test_rest(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        metrics = RecordingMetrics()
+
+        async def run():
+            async with FakeExchange(seed=1) as exchange:
+                api = BittrexAPI(api_url=exchange.api_url, metrics=metrics, retries=0)
+                try:
+                    await api.get_ticker('BTC-ETH')
+                    with self.assertRaises(BittrexApiError):
+                        await api.get_ticker('BTC-XXX')
+                finally:
+                    await api.close(delay=0)
+
+        loop.run_until_complete(run())
+        loop.close()
+        asyncio.set_event_loop(None)
+
+        self.assertEqual(metrics.names(), [
+            'request_wait_seconds', 'response_bytes', 'request_seconds',
+            'request_wait_seconds', 'response_bytes', 'request_errors_total', 'request_seconds'
+        ])
+        self.assertEqual(metrics.calls[0][2], {'endpoint': 'v1.1/public/getticker', 'priority': 'public'})
+        self.assertGreater(metrics.calls[1][1], 0)
+        self.assertEqual(metrics.calls[5][2], {'endpoint': 'v1.1/public/getticker', 'error': 'BittrexApiError'})
+
+    def test_socket(self):
+        metrics = RecordingMetrics()
+        connection = SocketConnection(FakeSocket(), metrics=metrics)
+        connection.subscribe(callbacks=('uE',))
+        sent = int(time() * 1000) - 2000
+
+        connection._handle_frame(json.dumps({'M': [
+            {'M': 'uE', 'A': [{'market_name': 'BTC-ETH', 'fills': [{'time_stamp': sent}]}]},
+            {'M': 'uS', 'A': [{'deltas': []}]}
+        ]}))
+
+        self.assertEqual(metrics.names(), [
+            'socket_frames_total', 'socket_messages_total', 'socket_decode_seconds', 'socket_lag_seconds',
+            'socket_messages_total'
+        ])
+        self.assertEqual(metrics.calls[1], ('socket_messages_total', 1, {'callback': 'uE'}))
+        self.assertAlmostEqual(metrics.calls[3][1], 2.0, places=0)
+        self.assertEqual(metrics.calls[4], ('socket_messages_total', 1, {'callback': 'uS'}))
+
+    def test_statsd(self):
+        server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        server.bind(('127.0.0.1', 0))
+        server.settimeout(1)
+        metrics = StatsDMetrics(port=server.getsockname()[1])
+        metrics.increment('socket_frames_total')
+        metrics.observe('request_seconds', 0.25, {'endpoint': 'v1.1/public/getticker'})
+        metrics.observe('response_bytes', 100)
+        metrics.close()
+
+        self.assertEqual(server.recv(2048).decode().split('\n'), [
+            'bittrex.socket_frames_total:1|c',
+            'bittrex.request:250.000|ms|#endpoint:v1.1/public/getticker',
+            'bittrex.response_bytes:100|h'
+        ])
+        server.close()
+
+    @skipIf(prometheus_client is None, "prometheus_client is not installed")
+    def test_prometheus(self):
+        registry = prometheus_client.CollectorRegistry()
+        metrics = PrometheusMetrics(registry=registry)
+        metrics.increment('socket_messages_total', 3, {'callback': 'uE'})
+        metrics.observe('request_seconds', 0.25, {'endpoint': 'v1.1/public/getticker'})
+
+        self.assertEqual(registry.get_sample_value('bittrex_socket_messages_total', {'callback': 'uE'}), 3)
+        self.assertEqual(
+            registry.get_sample_value('bittrex_request_seconds_count', {'endpoint': 'v1.1/public/getticker'}),
+            1
+        )
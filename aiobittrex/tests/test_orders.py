@@ -0,0 +1,95 @@
+import asyncio
+from unittest import TestCase
+
+from aiobittrex.api import BittrexAPI
+from aiobittrex.orders import OrderTracker
+from aiobittrex.socket import BittrexSocket
+from aiobittrex.testing import FakeExchange
+
+
+def order_delta(delta_type, remaining, updated, order_uuid='a'):
+    return {'nonce': updated, 'type': delta_type, 'order': {
+        'order_uuid': order_uuid, 'exchange': 'BTC-ETH', 'quantity': 1.0, 'quantity_remaining': remaining,
+        'is_open': delta_type < OrderTracker.FILL, 'updated': updated
+    }}
+
+
+class FakeAPI:
+
+    def __init__(self):
+        self.order = {'OrderUuid': 'a', 'Exchange': 'BTC-ETH', 'Quantity': 1.0, 'QuantityRemaining': 1.0,
+                      'IsOpen': True}
+
+    async def buy_limit(self, market, quantity, rate):
+        return {'uuid': 'a'}
+
+    async def get_order(self, order_id):
+        return dict(self.order)
+
+
+class OrderTrackerTestCase(TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def test_events(self):
+        tracker = OrderTracker()
+        # the delta is received before the REST response
+        self.assertFalse(tracker.apply(order_delta(OrderTracker.OPEN, 1.0, 1)))
+        tracked = tracker.track('a')
+        self.assertTrue(tracker.apply(order_delta(OrderTracker.PARTIAL, 0.4, 3)))
+        self.assertFalse(tracker.apply(order_delta(OrderTracker.PARTIAL, 0.6, 2)))  # outdated
+        self.assertTrue(tracker.apply(order_delta(OrderTracker.FILL, 0.0, 4)))
+        self.assertNotIn('a', tracker)
+
+        async def run():
+            return [(t, o['quantity_remaining']) async for t, o in tracked], await tracked.wait()
+
+        events, order = self.loop.run_until_complete(run())
+        self.assertEqual(events, [(OrderTracker.OPEN, 1.0), (OrderTracker.PARTIAL, 0.4), (OrderTracker.FILL, 0.0)])
+        self.assertEqual(order['quantity_remaining'], 0.0)
+
+    def test_polling(self):
+        api = FakeAPI()
+        tracker = OrderTracker(api=api, poll_interval=0.01)
+
+        async def run():
+            tracked = await tracker.buy_limit('BTC-ETH', 1.0, 0.07)
+            self.assertEqual(await tracked.__anext__(), (OrderTracker.OPEN, tracked.order))
+            api.order.update(QuantityRemaining=0.0, IsOpen=False)
+            return await tracked.wait(timeout=1)
+
+        order = self.loop.run_until_complete(run())
+        tracker.close()
+        self.assertFalse(order['is_open'])
+        self.assertGreaterEqual(tracker.polls, 2)
+
+    def test_socket(self):
+        async def run():
+            async with FakeExchange(rates={'uB': 0, 'uO': 0}, seed=1) as exchange:
+                api = BittrexAPI(api_key='key', api_secret='secret', api_url=exchange.api_url)
+                socket = BittrexSocket(api_key='key', api_secret='secret', socket_url=exchange.socket_url)
+                tracker = OrderTracker(api=api, poll_interval=60)
+                runner = asyncio.ensure_future(tracker.run(socket))
+                try:
+                    while not socket.connection.connected or len(exchange.invocations) < 2:
+                        await asyncio.sleep(0.01)
+                    tracked = await tracker.buy_limit('BTC-ETH', 1.0, 0.01)
+                    await api.cancel_order(tracked.order_uuid)
+                    order = await tracked.wait(timeout=5)
+                    return [t async for t, _ in tracked], order, tracker.polls
+                finally:
+                    runner.cancel()
+                    tracker.close()
+                    await socket.close()
+                    await api.close(delay=0)
+
+        events, order, polls = self.loop.run_until_complete(run())
+        self.assertEqual(events, [OrderTracker.OPEN, OrderTracker.CANCEL])
+        self.assertTrue(order['cancel_initiated'])
+        self.assertEqual(polls, 0)
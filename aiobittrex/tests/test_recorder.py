@@ -0,0 +1,75 @@
+import asyncio
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+import aiohttp
+
+from aiobittrex.connection import SocketConnection
+from aiobittrex.recorder import FrameReader, FrameRecorder, replay
+from aiobittrex.tests.test_connection import FakeSocket
+
+
+def frame(nonce):
+    return json.dumps({'M': [{'M': 'uE', 'A': [{'market_name': 'BTC-ETH', 'nonce': nonce}]}]})
+
+
+class RecorderTestCase(TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.path = os.path.join(tempfile.mkdtemp(), 'frames.rec')
+
+    def tearDown(self):
+        self.loop.close()
+        os.remove(self.path)
+
+    def test_record(self):
+        connection = SocketConnection(FakeSocket(), recorder=FrameRecorder(self.path))
+        subscription = connection.subscribe(callbacks=('uE',))
+
+        async def run():
+            ws = await connection.connect()
+            for nonce in range(3):
+                ws._frames.put_nowait(aiohttp.WSMessage(aiohttp.WSMsgType.TEXT, frame(nonce), None))
+            result = [(await subscription.__anext__())['nonce'] for _ in range(3)]
+            await connection.close()
+            return result
+
+        self.assertEqual(self.loop.run_until_complete(run()), [0, 1, 2])
+        connection.recorder.close()
+        self.assertEqual(connection.recorder.frames, 3)
+
+        # a record cut by a crash
+        with FrameRecorder(self.path) as recorder:
+            recorder.write(frame(3), timestamp=1.0)
+        os.truncate(self.path, os.path.getsize(self.path) - 5)
+
+        with FrameReader(self.path) as reader:
+            frames = list(reader)
+        self.assertEqual([f.decode() for _, f in frames], [frame(n) for n in range(3)])
+
+    def test_replay(self):
+        with FrameRecorder(self.path) as recorder:
+            for nonce in range(250):
+                recorder.write(frame(nonce), timestamp=1000.0 + nonce * 0.0001)
+
+        connection = SocketConnection(FakeSocket())
+        subscription = connection.subscribe(callbacks=('uE',), maxsize=100)
+        received = []
+
+        async def consume():
+            async for m in subscription:
+                received.append(m['nonce'])
+
+        async def run():
+            consumer = asyncio.ensure_future(consume())
+            with FrameReader(self.path) as reader:
+                n = await replay(connection, reader, speed=1.0)
+            await asyncio.sleep(0)
+            consumer.cancel()
+            return n
+
+        self.assertEqual(self.loop.run_until_complete(run()), 250)
+        self.assertEqual(received, list(range(250)))
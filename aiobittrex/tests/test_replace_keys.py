@@ -1,37 +1,84 @@
 from unittest import TestCase
 
 from aiobittrex.socket import BittrexSocket
+from aiobittrex.translate import TRANSLATORS
+
+
+EXCHANGE_STATE = {
+    "BTC-TRX": {
+        "M": None,
+        "N": 10647,
+        "Z": [{
+            "Q": 242.46304653,
+            "R": 8.67e-06
+        }, {
+            "Q": 417459.77306401,
+            "R": 8.64e-06
+        }]
+    }
+}
+
+EXCHANGE_STATE_TRANSLATED = {
+    'BTC-TRX': {
+        'buys': [{
+            'quantity': 242.46304653,
+            'rate': 8.67e-06
+        }, {
+            'quantity': 417459.77306401,
+            'rate': 8.64e-06
+        }],
+        'market_name': None,
+        'nonce': 10647
+    }
+}
+
+EXCHANGE_DELTA = {
+    "M": "BTC-TRX",
+    "N": 11919,
+    "Z": [],
+    "S": [{"TY": 2, "R": 8.7e-06, "Q": 197473.52148216}],
+    "f": [{"FI": 5020071, "OT": "BUY", "R": 8.7e-06, "Q": 28376.84449489, "T": 1524905878547}]
+}
+
+ORDER_DELTA = {
+    "w": "1a601d8b-c74f-4b93-2582-06eb8984d79f",
+    "N": 15,
+    "TY": 0,
+    "o": {
+        "U": "1a601d8b-c74f-4b93-2582-06eb8984d79f",
+        "I": 935252102,
+        "OU": "aab92e5d-350e-434b-b8e1-c42b354c5e17",
+        "E": "BTC-LTC",
+        "OT": "LIMIT_SELL",
+        "Q": 0.22809,
+        "q": 0.22809,
+        "X": 0.01189602,
+        "n": 0.0,
+        "P": 0.0,
+        "PU": 0.0,
+        "Y": 1558239377660,
+        "C": None,
+        "i": True,
+        "CI": False,
+        "K": False,
+        "k": False,
+        "J": None,
+        "j": None,
+        "u": 1558239377660,
+        "PassthroughUuid": None
+    }
+}
 
 
 class ReplaceKeysTestCase(TestCase):
 
     def test_replace_keys(self):
-        inp = {
-            "BTC-TRX": {
-                "M": None,
-                "N": 10647,
-                "Z": [{
-                    "Q": 242.46304653,
-                    "R": 8.67e-06
-                }, {
-                    "Q": 417459.77306401,
-                    "R": 8.64e-06
-                }]
-            }
-        }
-
-        out = {
-            'BTC-TRX': {
-                'buys': [{
-                    'quantity': 242.46304653,
-                    'rate': 8.67e-06
-                }, {
-                    'quantity': 417459.77306401,
-                    'rate': 8.64e-06
-                }],
-                'market_name': None,
-                'nonce': 10647
-            }
-        }
-
-        self.assertEqual(BittrexSocket.replace_keys(inp), out)
+        self.assertEqual(BittrexSocket.replace_keys(EXCHANGE_STATE), EXCHANGE_STATE_TRANSLATED)
+
+    def test_translators(self):
+        self.assertEqual(
+            TRANSLATORS['QueryExchangeState'](EXCHANGE_STATE['BTC-TRX']),
+            EXCHANGE_STATE_TRANSLATED['BTC-TRX']
+        )
+        self.assertEqual(TRANSLATORS['uE'](EXCHANGE_DELTA), BittrexSocket.replace_keys(EXCHANGE_DELTA))
+        self.assertEqual(TRANSLATORS['uO'](ORDER_DELTA), BittrexSocket.replace_keys(ORDER_DELTA))
@@ -0,0 +1,75 @@
+import asyncio
+from unittest import TestCase
+
+from aiobittrex.scheduler import RequestScheduler
+
+
+class RequestSchedulerTestCase(TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_priority(self):
+        scheduler = RequestScheduler(rate_limit=1, period=0.02)
+        granted = []
+
+        async def request(priority):
+            await scheduler.acquire(priority=priority)
+            granted.append(priority)
+
+        async def run():
+            await request(RequestScheduler.PUBLIC)
+            await asyncio.gather(
+                request(RequestScheduler.PUBLIC),
+                request(RequestScheduler.ACCOUNT),
+                request(RequestScheduler.TRADE)
+            )
+
+        self.loop.run_until_complete(asyncio.wait_for(run(), 1))
+
+        self.assertEqual(granted, [
+            RequestScheduler.PUBLIC,
+            RequestScheduler.TRADE,
+            RequestScheduler.ACCOUNT,
+            RequestScheduler.PUBLIC
+        ])
+        self.assertEqual(scheduler.wait_stats[RequestScheduler.PUBLIC].count, 2)
+        self.assertGreater(scheduler.stats()['wait']['public']['max'], 0.0)
+
+    def test_budgets(self):
+        # account requests are limited, public requests are not blocked by them
+        scheduler = RequestScheduler(rate_limit=10, period=10, budgets={RequestScheduler.ACCOUNT: (1, 10)})
+
+        async def run():
+            await scheduler.acquire(priority=RequestScheduler.ACCOUNT)
+            blocked = asyncio.ensure_future(scheduler.acquire(priority=RequestScheduler.ACCOUNT))
+            await asyncio.wait_for(scheduler.acquire(priority=RequestScheduler.PUBLIC, version='v2.0'), 1)
+            self.assertFalse(blocked.done())
+            self.assertEqual(scheduler.waiting, 1)
+            blocked.cancel()
+
+        self.loop.run_until_complete(run())
+
+    def test_adaptive(self):
+        now = [0.0]
+        scheduler = RequestScheduler(rate_limit=60, period=60.0, increase_interval=10.0, clock=lambda: now[0])
+
+        scheduler.throttled(retry_after=5)
+        scheduler.throttled()
+        self.assertEqual(scheduler.rate_limit, 30)
+        self.assertEqual(scheduler.throttles, 2)
+        self.assertEqual(scheduler.effective_rate, 0.5)
+
+        now[0] = 5.0
+        scheduler.succeeded()
+        self.assertEqual(scheduler.rate_limit, 30)
+        now[0] = 10.0
+        scheduler.succeeded()
+        self.assertEqual(scheduler.rate_limit, 31)
+
+        scheduler.throttled()
+        self.assertEqual(scheduler.rate_limit, 15)
+        self.assertEqual(scheduler._paused_until, 14.0)
@@ -0,0 +1,65 @@
+import asyncio
+import hashlib
+import hmac
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from aiobittrex.api import BittrexAPI
+from aiobittrex.scheduler import RequestScheduler
+from aiobittrex.signing import Signer
+from aiobittrex.testing import FakeExchange
+
+
+class SignerTestCase(TestCase):
+
+    def test_sign(self):
+        signer = Signer('secret')
+        for message in ('https://bittrex.com/api/v1.1/account/getbalances?apikey=key&nonce=1', ''):
+            self.assertEqual(
+                signer.sign(message),
+                hmac.new(b'secret', message.encode(), hashlib.sha512).hexdigest()
+            )
+
+    def test_nonce_same_millisecond(self):
+        signer = Signer('secret', clock=lambda: 1558239377.660)
+        self.assertEqual([signer.nonce() for _ in range(3)], [1558239377660, 1558239377661, 1558239377662])
+
+    def test_nonce_clock_backwards(self):
+        times = iter([100.0, 99.0, 100.5, 101.0])
+        signer = Signer('secret', clock=lambda: next(times))
+        self.assertEqual([signer.nonce() for _ in range(4)], [100000, 100001, 100500, 101000])
+
+    def test_nonce_threads(self):
+        signer = Signer('secret')
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            nonces = list(executor.map(lambda _: signer.nonce(), range(10000)))
+        self.assertEqual(len(set(nonces)), len(nonces))
+
+
+class SignedRequestsTestCase(TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def test_concurrent(self):
+        async def run():
+            async with FakeExchange(seed=1) as exchange:
+                api = BittrexAPI(
+                    api_key='key',
+                    api_secret='secret',
+                    api_url=exchange.api_url,
+                    scheduler=RequestScheduler(rate_limit=1000, period=1.0)
+                )
+                try:
+                    return await asyncio.gather(*(api.get_balance('BTC') for _ in range(50)))
+                finally:
+                    await api.close()
+
+        balances = self.loop.run_until_complete(asyncio.wait_for(run(), 10))
+        self.assertEqual(len(balances), 50)
+        self.assertTrue(all(b['Currency'] == 'BTC' for b in balances))
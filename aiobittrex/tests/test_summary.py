@@ -0,0 +1,41 @@
+import asyncio
+from unittest import TestCase
+
+from aiobittrex.summary import SummaryCache
+
+
+class SummaryCacheTestCase(TestCase):
+
+    def test_merge(self):
+        cache = SummaryCache()
+        cache.apply({'nonce': 11, 'deltas': [{'market_name': 'BTC-ETH', 'last': 0.073, 'bid': 0.072}]})
+        cache.load({'nonce': 10, 'summaries': [
+            {'market_name': 'BTC-ETH', 'last': 0.07, 'bid': 0.07},
+            {'market_name': 'BTC-ADA', 'last': 3.3e-05, 'bid': 3.2e-05}
+        ]})
+
+        # BTC-ETH delta is newer than the snapshot
+        self.assertEqual(cache['BTC-ETH']['last'], 0.073)
+        self.assertEqual(cache['BTC-ADA']['last'], 3.3e-05)
+        self.assertEqual(cache.version, 2)
+
+        cache.apply({'deltas': [{'market_name': 'BTC-ADA', 'last': 3.4e-05, 'base_volume': 1481.8}]})
+        self.assertEqual(cache['BTC-ADA'], {'market_name': 'BTC-ADA', 'last': 3.4e-05, 'bid': 3.2e-05, 'base_volume': 1481.8})
+        self.assertEqual(list(cache.changed_since(2)), ['BTC-ADA'])
+        self.assertFalse(cache.apply({'nonce': 9, 'deltas': [{'market_name': 'BTC-ETH', 'last': 0.06}]}))
+
+    def test_wait_changed(self):
+        loop = asyncio.new_event_loop()
+        cache = SummaryCache()
+
+        async def run():
+            waiter = asyncio.ensure_future(cache.wait_changed(cache.version, timeout=1))
+            await asyncio.sleep(0)
+            cache.apply({'nonce': 1, 'deltas': [{'market_name': 'BTC-ETH', 'last': 0.07}]})
+            return await waiter
+
+        version, changed = loop.run_until_complete(run())
+        loop.close()
+
+        self.assertEqual(version, 1)
+        self.assertEqual(changed, {'BTC-ETH': {'market_name': 'BTC-ETH', 'last': 0.07}})
@@ -0,0 +1,75 @@
+import asyncio
+from unittest import TestCase
+
+from aiobittrex.api import BittrexAPI
+from aiobittrex.socket import BittrexSocket
+from aiobittrex.testing import FakeExchange
+
+
+class FakeExchangeTestCase(TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def run_async(self, coro):
+        return self.loop.run_until_complete(asyncio.wait_for(coro, 10))
+
+    def test_rest(self):
+        async def run():
+            async with FakeExchange(seed=1) as exchange:
+                api = BittrexAPI(api_key='key', api_secret='secret', api_url=exchange.api_url)
+                try:
+                    markets = await api.get_markets()
+                    book = await api.get_order_book('BTC-ETH')
+                    candles = await api.get_candles('BTC-ETH', 'oneMin', columnar=False)
+                    order = await api.buy_limit('BTC-ETH', quantity=1, rate=0.01)
+                    open_orders = await api.get_open_orders()
+                    await api.cancel_order(order['uuid'])
+                    cancelled = await api.get_order(order['uuid'])
+                finally:
+                    await api.close()
+                return markets, book, candles, order, open_orders, cancelled
+
+        markets, book, candles, order, open_orders, cancelled = self.run_async(run())
+        self.assertIn('BTC-ETH', [m['MarketName'] for m in markets])
+        self.assertGreater(book['buy'][0]['Rate'], book['buy'][1]['Rate'])
+        self.assertLess(book['buy'][0]['Rate'], book['sell'][0]['Rate'])
+        self.assertEqual(len(candles), 100)
+        self.assertEqual([o['OrderUuid'] for o in open_orders], [order['uuid']])
+        self.assertFalse(cancelled['IsOpen'])
+
+    def test_socket(self):
+        async def run():
+            async with FakeExchange(rates={'uE': 500, 'uB': 0, 'uO': 0}, seed=1) as exchange:
+                socket = BittrexSocket(api_key='key', api_secret='secret', socket_url=exchange.socket_url)
+                try:
+                    state = await socket.get_market(['BTC-ETH'])
+                    nonces = []
+                    async for m in socket.listen_market(['BTC-ETH']):
+                        nonces.append(m['nonce'])
+                        if len(nonces) == 20:
+                            break
+
+                    account = socket.listen_account()
+                    api = BittrexAPI(api_key='key', api_secret='secret', api_url=exchange.api_url)
+                    listener = asyncio.ensure_future(account.__anext__())
+                    while not any(m == 'Authenticate' for m, _ in exchange.invocations):
+                        await asyncio.sleep(0.01)
+                    await asyncio.sleep(0.05)
+                    order = await api.buy_limit('BTC-ETH', quantity=1, rate=0.01)
+                    await api.close()
+                    delta = await listener
+                    await account.aclose()
+                finally:
+                    await socket.close()
+                return state, nonces, order, delta
+
+        state, nonces, order, delta = self.run_async(run())
+        self.assertEqual(len(state['BTC-ETH']['buys']), 50)
+        self.assertEqual(nonces, list(range(nonces[0], nonces[0] + 20)))
+        self.assertEqual(delta['order']['order_uuid'], order['uuid'])
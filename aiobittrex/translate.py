@@ -0,0 +1,239 @@
+from itertools import count
+
+from .records import BalanceDelta, BookLevel, Candle, Fill, OrderDelta, SummaryDelta, to_record
+
+KEYS = {
+    'A': 'ask',
+    'a': 'available',
+    'B': 'bid',
+    'b': 'balance',
+    'C': 'closed',
+    'c': 'currency',
+    'CI': 'cancel_initiated',
+    'D': 'deltas',
+    'd': 'delta',
+    'DT': 'order_delta_type',
+    'E': 'exchange',
+    'e': 'exchange_delta_type',
+    'F': 'fill_type',
+    'FI': 'fill_id',
+    'f': 'fills',
+    'G': 'open_buy_orders',
+    'g': 'open_sell_orders',
+    'H': 'high',
+    'h': 'auto_sell',
+    'I': 'id',
+    'i': 'is_open',
+    'J': 'condition',
+    'j': 'condition_target',
+    'K': 'immediate_or_cancel',
+    'k': 'is_conditional',
+    'L': 'low',
+    'l': 'last',
+    'M': 'market_name',
+    'm': 'base_volume',
+    'N': 'nonce',
+    'n': 'commission_paid',
+    'O': 'orders',
+    'o': 'order',
+    'OT': 'order_type',
+    'OU': 'order_uuid',
+    'P': 'price',
+    'p': 'crypto_address',
+    'PD': 'prev_day',
+    'PU': 'price_per_unit',
+    'Q': 'quantity',
+    'q': 'quantity_remaining',
+    'R': 'rate',
+    'r': 'requested',
+    'S': 'sells',
+    's': 'summaries',
+    'T': 'time_stamp',
+    't': 'total',
+    'TY': 'type',
+    'U': 'uuid',
+    'u': 'updated',
+    'V': 'volume',
+    'W': 'account_id',
+    'w': 'account_uuid',
+    'X': 'limit',
+    'x': 'created',
+    'Y': 'opened',
+    'y': 'state',
+    'Z': 'buys',
+    'z': 'pending'
+}
+
+
+def replace_keys(d, keys=KEYS):
+    if not isinstance(d, dict):
+        return d
+    result = {}
+    for key, value in d.items():
+        key = keys.get(key, key)
+        if isinstance(value, dict):
+            result[key] = replace_keys(value, keys)
+        elif isinstance(value, list):
+            result[key] = [replace_keys(v, keys) for v in value]
+        else:
+            result[key] = value
+    return result
+
+
+def compile_translator(shape, keys=KEYS):
+    """Generate a translator for a payload shape.
+
+    The shape maps the expected keys to None for plain values, to a nested shape for dicts,
+    to a (record class, {key: field}) tuple for records and to a list with a nested shape (or a record tuple)
+    for lists.
+    The generated code builds translated dicts and records from literals, payloads that do not match the shape
+    (missing or extra keys) fall back to the generic replace_keys (to_record for records).
+    """
+    names = count()
+    source = []
+    namespace = {'replace_keys': replace_keys, 'to_record': to_record, 'keys': keys}
+
+    def literal(shape, var):
+        if isinstance(shape, tuple):
+            record, fields = shape
+            namespace[record.__name__] = record
+            return f'{record.__name__}(' + ', '.join(f'{f}={var}[{k!r}]' for k, f in fields.items()) + ')'
+        items = []
+        for key, nested in shape.items():
+            value = f'{var}[{key!r}]'
+            if nested is not None:
+                value = f'{function(nested)}({value})'
+            items.append(f'{keys.get(key, key)!r}: {value}')
+        return '{' + ', '.join(items) + '}'
+
+    def fallback(shape, var):
+        if isinstance(shape, tuple):
+            name = f'fields_{next(names)}'
+            namespace[name] = shape[1]
+            return f'to_record({shape[0].__name__}, {name}, {var})'
+        return f'replace_keys({var}, keys)'
+
+    def function(shape):
+        name = f'translate_{next(names)}'
+        if isinstance(shape, list):
+            item = shape[0]
+            size = len(item[1]) if isinstance(item, tuple) else len(item)
+            build, default = literal(item, 'd'), fallback(item, 'd')
+            source.extend([
+                f'def {name}(v):',
+                '    if not isinstance(v, list):',
+                '        return replace_keys(v, keys)',
+                '    try:',
+                f'        return [{build} if len(d) == {size} else {default} for d in v]',
+                '    except (KeyError, TypeError):',
+                f'        return [{default} for d in v]',
+                ''
+            ])
+        else:
+            size = len(shape[1]) if isinstance(shape, tuple) else len(shape)
+            build, default = literal(shape, 'd'), fallback(shape, 'd')
+            source.extend([
+                f'def {name}(d):',
+                f'    if isinstance(d, dict) and len(d) == {size}:',
+                '        try:',
+                f'            return {build}',
+                '        except (KeyError, TypeError):',
+                '            pass',
+                f'    return {default}',
+                ''
+            ])
+        return name
+
+    name = function(shape)
+    exec('\n'.join(source), namespace)
+    return namespace[name]
+
+LEVEL = {'Q': None, 'R': None}
+LEVEL_DELTA = {'TY': None, 'R': None, 'Q': None}
+FILL = {'I': None, 'T': None, 'Q': None, 'P': None, 't': None, 'F': None, 'OT': None, 'U': None}
+FILL_DELTA = {'FI': None, 'OT': None, 'R': None, 'Q': None, 'T': None}
+SUMMARY = {
+    'M': None, 'H': None, 'L': None, 'V': None, 'l': None, 'm': None, 'T': None,
+    'B': None, 'A': None, 'G': None, 'g': None, 'PD': None, 'x': None
+}
+SUMMARY_LIGHT = {'M': None, 'l': None, 'm': None}
+BALANCE = {'U': None, 'W': None, 'c': None, 'b': None, 'a': None, 'z': None, 'p': None, 'r': None, 'u': None, 'h': None}
+ORDER = {
+    'U': None, 'I': None, 'OU': None, 'E': None, 'OT': None, 'Q': None, 'q': None, 'X': None, 'n': None,
+    'P': None, 'PU': None, 'Y': None, 'C': None, 'i': None, 'CI': None, 'K': None, 'k': None, 'J': None,
+    'j': None, 'u': None, 'PassthroughUuid': None
+}
+
+EXCHANGE_STATE = {'M': None, 'N': None, 'Z': [LEVEL], 'S': [LEVEL], 'f': [FILL]}
+EXCHANGE_DELTA = {'M': None, 'N': None, 'Z': [LEVEL_DELTA], 'S': [LEVEL_DELTA], 'f': [FILL_DELTA]}
+SUMMARY_STATE = {'N': None, 's': [SUMMARY]}
+SUMMARY_DELTA = {'N': None, 'D': [SUMMARY]}
+SUMMARY_LIGHT_DELTA = {'D': [SUMMARY_LIGHT]}
+BALANCE_DELTA = {'N': None, 'd': BALANCE}
+ORDER_DELTA = {'w': None, 'N': None, 'TY': None, 'o': ORDER}
+
+TRANSLATORS = {
+    'QueryExchangeState': compile_translator(EXCHANGE_STATE),
+    'QuerySummaryState': compile_translator(SUMMARY_STATE),
+    'uE': compile_translator(EXCHANGE_DELTA),
+    'uS': compile_translator(SUMMARY_DELTA),
+    'uL': compile_translator(SUMMARY_LIGHT_DELTA),
+    'uB': compile_translator(BALANCE_DELTA),
+    'uO': compile_translator(ORDER_DELTA)
+}
+
+# typed mode, record fields for the payload keys
+
+LEVEL_FIELDS = {'Q': 'quantity', 'R': 'rate'}
+LEVEL_DELTA_FIELDS = {'TY': 'type', 'R': 'rate', 'Q': 'quantity'}
+FILL_FIELDS = {
+    'I': 'id', 'T': 'time_stamp', 'Q': 'quantity', 'P': 'rate', 't': 'total', 'F': 'fill_type', 'OT': 'order_type',
+    'U': 'uuid'
+}
+FILL_DELTA_FIELDS = {'FI': 'id', 'OT': 'order_type', 'R': 'rate', 'Q': 'quantity', 'T': 'time_stamp'}
+SUMMARY_FIELDS = {k: KEYS[k] for k in SUMMARY}
+SUMMARY_LIGHT_FIELDS = {k: KEYS[k] for k in SUMMARY_LIGHT}
+BALANCE_FIELDS = {k: KEYS[k] for k in BALANCE}
+ORDER_FIELDS = dict({k: KEYS[k] for k in ORDER if k in KEYS}, PassthroughUuid='passthrough_uuid')
+
+TYPED_TRANSLATORS = {
+    'QueryExchangeState': compile_translator({
+        'M': None, 'N': None,
+        'Z': [(BookLevel, LEVEL_FIELDS)], 'S': [(BookLevel, LEVEL_FIELDS)], 'f': [(Fill, FILL_FIELDS)]
+    }),
+    'QuerySummaryState': compile_translator({'N': None, 's': [(SummaryDelta, SUMMARY_FIELDS)]}),
+    'uE': compile_translator({
+        'M': None, 'N': None,
+        'Z': [(BookLevel, LEVEL_DELTA_FIELDS)], 'S': [(BookLevel, LEVEL_DELTA_FIELDS)],
+        'f': [(Fill, FILL_DELTA_FIELDS)]
+    }),
+    'uS': compile_translator({'N': None, 'D': [(SummaryDelta, SUMMARY_FIELDS)]}),
+    'uL': compile_translator({'D': [(SummaryDelta, SUMMARY_LIGHT_FIELDS)]}),
+    'uB': compile_translator({'N': None, 'd': (BalanceDelta, BALANCE_FIELDS)}),
+    'uO': compile_translator({'w': None, 'N': None, 'TY': None, 'o': (OrderDelta, ORDER_FIELDS)})
+}
+
+REST_LEVEL_FIELDS = {'Quantity': 'quantity', 'Rate': 'rate'}
+REST_FILL_FIELDS = {
+    'Id': 'id', 'TimeStamp': 'time_stamp', 'Quantity': 'quantity', 'Price': 'rate', 'Total': 'total',
+    'FillType': 'fill_type', 'OrderType': 'order_type', 'Uuid': 'uuid'
+}
+REST_SUMMARY_FIELDS = {
+    'MarketName': 'market_name', 'High': 'high', 'Low': 'low', 'Volume': 'volume', 'Last': 'last',
+    'BaseVolume': 'base_volume', 'TimeStamp': 'time_stamp', 'Bid': 'bid', 'Ask': 'ask',
+    'OpenBuyOrders': 'open_buy_orders', 'OpenSellOrders': 'open_sell_orders', 'PrevDay': 'prev_day',
+    'Created': 'created'
+}
+REST_CANDLE_FIELDS = {
+    'T': 'time_stamp', 'O': 'open', 'H': 'high', 'L': 'low', 'C': 'close', 'V': 'volume', 'BV': 'base_volume'
+}
+
+REST_TRANSLATORS = {
+    'order_book': compile_translator({
+        'buy': [(BookLevel, REST_LEVEL_FIELDS)], 'sell': [(BookLevel, REST_LEVEL_FIELDS)]
+    }),
+    'levels': compile_translator([(BookLevel, REST_LEVEL_FIELDS)]),
+    'fills': compile_translator([(Fill, REST_FILL_FIELDS)]),
+    'summaries': compile_translator([(SummaryDelta, REST_SUMMARY_FIELDS)]),
+    'candles': compile_translator([(Candle, REST_CANDLE_FIELDS)])
+}
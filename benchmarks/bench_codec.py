@@ -0,0 +1,29 @@
+"""Compare socket payload decoding with the available JSON backends.
+
+python -m benchmarks.bench_codec
+"""
+import json
+import zlib
+from base64 import b64encode
+from timeit import repeat
+
+from aiobittrex.codec import Codec, JSON_BACKENDS
+from benchmarks.bench_replace_keys import large_exchange_state
+
+
+def encode(data):
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    return b64encode(compressor.compress(json.dumps(data).encode()) + compressor.flush()).decode()
+
+
+def main():
+    payload = encode(large_exchange_state(levels=1000))
+    print(f'{"backend":<12}{"decode":>14}{"payloads/s":>14}')
+    for backend in JSON_BACKENDS:
+        codec = Codec(backend=backend)
+        seconds = min(repeat(lambda: codec.decode(payload), number=200, repeat=5)) / 200
+        print(f'{backend:<12}{seconds * 1e6:>12.1f}us{1 / seconds:>14.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+"""Compare depth queries over a list of levels with DepthBook.
+
+python -m benchmarks.bench_depth
+"""
+import random
+from timeit import repeat
+
+from aiobittrex.depth import DepthBook
+
+
+def python_vwap(levels, size):
+    filled = cost = 0.0
+    for level in levels:
+        quantity = min(level['quantity'], size - filled)
+        filled += quantity
+        cost += quantity * level['rate']
+        if filled >= size:
+            return cost / size
+    return None
+
+
+def main():
+    sells = [{'rate': 1.0 + n * 0.0001, 'quantity': random.uniform(0.1, 10.0)} for n in range(5000)]
+    sizes = [random.uniform(1.0, 20000.0) for _ in range(100)]
+
+    loop = min(repeat(lambda: [python_vwap(sells, s) for s in sizes], number=5, repeat=3)) / 5
+    build = min(repeat(lambda: DepthBook.from_levels(None, [], sells), number=5, repeat=3)) / 5
+    book = DepthBook.from_levels(None, [], sells)
+    batch = min(repeat(lambda: book.sells.vwap(sizes), number=50, repeat=3)) / 50
+    print(f'levels: {len(sells)}, sizes: {len(sizes)}')
+    print(f'{"python loop":<16}{loop * 1e3:>10.3f}ms')
+    print(f'{"DepthBook build":<16}{build * 1e3:>10.3f}ms')
+    print(f'{"DepthBook vwap":<16}{batch * 1e3:>10.3f}ms')
+
+
+if __name__ == '__main__':
+    main()
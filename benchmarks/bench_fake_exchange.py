@@ -0,0 +1,42 @@
+"""Socket consumer load test against the local fake exchange.
+
+python -m benchmarks.bench_fake_exchange [uE messages per second per market] [seconds]
+"""
+import asyncio
+import sys
+from time import perf_counter, time
+
+from aiobittrex.socket import BittrexSocket
+from aiobittrex.testing import FakeExchange
+
+
+async def run(rate, seconds):
+    markets = {f'BTC-C{n:03}': 0.001 * (n + 1) for n in range(100)}
+    async with FakeExchange(markets=markets, rates={'uE': rate}, seed=1) as exchange:
+        socket = BittrexSocket(socket_url=exchange.socket_url)
+        received = 0
+        lag = 0.0
+        started = perf_counter()
+        try:
+            async for m in socket.listen_market(list(markets)):
+                received += 1
+                for fill in m['fills']:
+                    lag = max(lag, time() - fill['time_stamp'] / 1000)
+                if perf_counter() - started >= seconds:
+                    break
+        finally:
+            await socket.close()
+        elapsed = perf_counter() - started
+    print(f'markets: {len(markets)}, target: {rate * len(markets):.0f} messages/s')
+    print(f'received: {received / elapsed:.0f} messages/s, pushed: {exchange.pushed / elapsed:.0f} messages/s')
+    print(f'max fill lag: {lag * 1000:.1f}ms')
+
+
+def main():
+    rate = float(sys.argv[1]) if len(sys.argv) > 1 else 20.0
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    asyncio.run(run(rate, seconds))
+
+
+if __name__ == '__main__':
+    main()
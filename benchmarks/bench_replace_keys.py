@@ -0,0 +1,45 @@
+"""Compare the generic replace_keys with the per message type translators.
+
+python -m benchmarks.bench_replace_keys
+"""
+import copy
+from timeit import repeat
+
+from aiobittrex.socket import BittrexSocket
+from aiobittrex.tests.test_replace_keys import EXCHANGE_STATE, EXCHANGE_DELTA, ORDER_DELTA
+from aiobittrex.translate import TRANSLATORS
+
+
+def large_exchange_state(levels=5000):
+    state = copy.deepcopy(EXCHANGE_STATE['BTC-TRX'])
+    level = state['Z'][0]
+    state['Z'] = [dict(level, R=level['R'] + i * 1e-08) for i in range(levels)]
+    state['S'] = [dict(level, R=level['R'] + i * 1e-08) for i in range(levels)]
+    state['f'] = [dict(EXCHANGE_DELTA['f'][0], I=i) for i in range(levels // 50)]
+    return state
+
+
+CASES = [
+    ('exchange state (2 levels)', 'QueryExchangeState', EXCHANGE_STATE['BTC-TRX'], 100000),
+    ('exchange state (10000 levels)', 'QueryExchangeState', large_exchange_state(), 20),
+    ('exchange delta', 'uE', EXCHANGE_DELTA, 100000),
+    ('order delta', 'uO', ORDER_DELTA, 100000)
+]
+
+
+def best(func, number):
+    return min(repeat(func, number=number, repeat=5)) / number
+
+
+def main():
+    print(f'{"case":<32}{"replace_keys":>16}{"translator":>16}{"speedup":>10}')
+    for name, callback, payload, number in CASES:
+        translate = TRANSLATORS[callback]
+        assert translate(payload) == BittrexSocket.replace_keys(payload)
+        generic = best(lambda: BittrexSocket.replace_keys(payload), number)
+        specialized = best(lambda: translate(payload), number)
+        print(f'{name:<32}{generic * 1e6:>14.2f}us{specialized * 1e6:>14.2f}us{generic / specialized:>9.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Socket feed throughput: recorded frames replayed through the decode and dispatch path.
+
+python -m benchmarks.bench_replay [recording]
+
+Without a recording, synthetic exchange and order deltas are recorded to a temporary file first.
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from time import perf_counter
+
+from aiobittrex.recorder import FrameReader, FrameRecorder, replay
+from aiobittrex.socket import BittrexSocket
+from aiobittrex.tests.test_replace_keys import EXCHANGE_DELTA, ORDER_DELTA
+from benchmarks.bench_codec import encode
+
+
+def record_synthetic(path, frames=20000):
+    with FrameRecorder(path) as recorder:
+        for n in range(frames):
+            if n % 10:
+                row = {'H': 'C2', 'M': 'uE', 'A': [encode(dict(EXCHANGE_DELTA, N=n))]}
+            else:
+                row = {'H': 'C2', 'M': 'uO', 'A': [encode(dict(ORDER_DELTA, N=n))]}
+            recorder.write(json.dumps({'C': 'd-1', 'M': [row]}), timestamp=n * 0.001)
+
+
+async def run(path):
+    socket = BittrexSocket()
+    connection = socket.connection
+    subscription = connection.subscribe(callbacks=('uE', 'uO', 'uS', 'uL', 'uB'), maxsize=0)
+    with FrameReader(path) as reader:
+        started = perf_counter()
+        frames = await replay(connection, reader)
+        seconds = perf_counter() - started
+    messages = subscription.depth
+    await socket.close()
+    print(f'frames: {frames}, messages: {messages}, {seconds:.3f}s')
+    print(f'{frames / seconds:.0f} frames/s, {messages / seconds:.0f} messages/s')
+    print(socket.codec.stats())
+
+
+def main():
+    if len(sys.argv) > 1:
+        path, temporary = sys.argv[1], False
+    else:
+        path, temporary = os.path.join(tempfile.mkdtemp(), 'frames.rec'), True
+        record_synthetic(path)
+    try:
+        asyncio.run(run(path))
+    finally:
+        if temporary:
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+"""Compare per request HMAC keying with copying the precomputed Signer state.
+
+python -m benchmarks.bench_signing
+"""
+import hashlib
+import hmac
+from timeit import repeat
+
+from aiobittrex.signing import Signer
+
+
+URL = 'https://bittrex.com/api/v1.1/market/buylimit?market=BTC-ETH&quantity=1.5&rate=0.07&apikey=key&nonce=1558239377660'
+SECRET = 'c1f0a4a2b4f84d7f9e8a2a2f1d6c0b7e'
+
+
+def main():
+    signer = Signer(SECRET)
+    cases = {
+        'hmac.new': lambda: hmac.new(key=SECRET.encode(), msg=URL.encode(), digestmod=hashlib.sha512).hexdigest(),
+        'Signer.sign': lambda: signer.sign(URL),
+        'Signer.nonce': signer.nonce,
+        'nonce + sign': lambda: signer.sign(f'{URL}&nonce={signer.nonce()}')
+    }
+    print(f'{"case":<16}{"time":>14}{"calls/s":>14}')
+    for name, func in cases.items():
+        seconds = min(repeat(func, number=20000, repeat=5)) / 20000
+        print(f'{name:<16}{seconds * 1e6:>12.2f}us{1 / seconds:>14.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+"""Hot paths benchmark suite with results history and regression check.
+
+python -m benchmarks.suite                       # run and compare with the last saved run
+python -m benchmarks.suite --save                # append the results to the history
+python -m benchmarks.suite -k decode --threshold 0.2
+
+Exits with status 1 if a case is slower than the last saved run by more than the threshold.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from timeit import repeat
+
+from aiobittrex.api import BittrexAPI
+from aiobittrex.cache import TTLCache
+from aiobittrex.scheduler import RequestScheduler
+from aiobittrex.socket import BittrexSocket
+from aiobittrex.testing import FakeExchange
+from aiobittrex.tests.test_replace_keys import EXCHANGE_DELTA, ORDER_DELTA
+from aiobittrex.translate import TRANSLATORS
+from benchmarks.bench_codec import encode
+from benchmarks.bench_replace_keys import large_exchange_state
+
+
+HISTORY = os.path.join(os.path.dirname(__file__), 'history.json')
+
+CASES = {}
+
+
+def case(name, number):
+    """Register a case: an async setup(loop) returning (func, async teardown or None)."""
+    def register(setup):
+        CASES[name] = (setup, number)
+        return setup
+    return register
+
+
+@case('decode delta', 20000)
+async def decode_delta(loop):
+    socket = BittrexSocket()
+    payload = encode(EXCHANGE_DELTA)
+    return lambda: socket._decode(payload), socket.close
+
+
+@case('decode exchange state (10000 levels)', 20)
+async def decode_state(loop):
+    socket = BittrexSocket()
+    payload = encode(large_exchange_state())
+    return lambda: socket._decode(payload), socket.close
+
+
+@case('replace_keys delta', 50000)
+async def replace_keys_delta(loop):
+    return lambda: BittrexSocket.replace_keys(ORDER_DELTA), None
+
+
+@case('translate delta', 50000)
+async def translate_delta(loop):
+    translate = TRANSLATORS['uO']
+    return lambda: translate(ORDER_DELTA), None
+
+
+@case('replace_keys exchange state (10000 levels)', 20)
+async def replace_keys_state(loop):
+    state = large_exchange_state()
+    return lambda: BittrexSocket.replace_keys(state), None
+
+
+@case('translate exchange state (10000 levels)', 20)
+async def translate_state(loop):
+    translate = TRANSLATORS['QueryExchangeState']
+    state = large_exchange_state()
+    return lambda: translate(state), None
+
+
+@case('dispatch frame (10 deltas)', 2000)
+async def dispatch_frame(loop):
+    socket = BittrexSocket()
+    connection = socket.connection
+    subscription = connection.subscribe(callbacks=('uE',), maxsize=0)
+    payload = encode(EXCHANGE_DELTA)
+    frame = json.dumps({'C': 'd-1', 'M': [{'H': 'C2', 'M': 'uE', 'A': [payload]} for _ in range(10)]})
+
+    def run():
+        connection._handle_frame(frame)
+        subscription._items.clear()
+
+    return run, socket.close
+
+
+@case('compose url and sign', 20000)
+async def sign(loop):
+    api = BittrexAPI(api_key='key', api_secret='secret')
+    options = {'market': 'BTC-ETH', 'quantity': 1.5, 'rate': 0.07, 'apikey': 'key', 'nonce': '1558239377660'}
+    return lambda: api._get_signature(api._compose_url('v1.1', 'market/buylimit', options)), api.close
+
+
+@case('request (local stub)', 200)
+async def request(loop):
+    exchange = FakeExchange(seed=1)
+    await exchange.start()
+    api = BittrexAPI(
+        api_url=exchange.api_url,
+        scheduler=RequestScheduler(rate_limit=10 ** 9, period=1.0),
+        cache=TTLCache(maxsize=0)
+    )
+
+    async def close():
+        await api.close(delay=0)
+        await exchange.close()
+
+    return lambda: loop.run_until_complete(api.get_ticker('BTC-ETH')), close
+
+
+def run_case(loop, name, repeats):
+    setup, number = CASES[name]
+    func, teardown = loop.run_until_complete(setup(loop))
+    try:
+        func()
+        return min(repeat(func, number=number, repeat=repeats)) / number
+    finally:
+        if teardown is not None:
+            loop.run_until_complete(teardown())
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(__file__),
+            stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-k', dest='keyword', help='run cases containing the keyword')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--history', default=HISTORY)
+    parser.add_argument('--save', action='store_true', help='append the results to the history')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed slowdown, 0.25 is 25%%')
+    args = parser.parse_args()
+
+    history = load_history(args.history)
+    baseline = history[-1]['results'] if history else {}
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    results = {}
+    regressions = []
+    print(f'{"case":<44}{"time":>14}{"baseline":>14}{"change":>10}')
+    for name in CASES:
+        if args.keyword and args.keyword not in name:
+            continue
+        seconds = results[name] = run_case(loop, name, args.repeat)
+        line = f'{name:<44}{seconds * 1e6:>12.2f}us'
+        if name in baseline:
+            change = seconds / baseline[name] - 1
+            line += f'{baseline[name] * 1e6:>12.2f}us{change:>+9.1%}'
+            if change > args.threshold:
+                regressions.append(name)
+                line += '  REGRESSION'
+        print(line)
+    loop.close()
+
+    if args.save:
+        history.append({
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'results': dict(baseline, **results)
+        })
+        with open(args.history, 'w') as f:
+            json.dump(history, f, indent=2)
+
+    if regressions:
+        print(f'Slower than the baseline by more than {args.threshold:.0%}: {", ".join(regressions)}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -60,5 +60,10 @@ setup(
     install_requires=[
         'aiohttp==3.5.4',
         'asyncio-throttle==0.1.1'
-    ]
+    ],
+    extras_require={
+        'numpy': ['numpy'],
+        'orjson': ['orjson'],
+        'ujson': ['ujson']
+    }
 )